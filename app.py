@@ -1,8 +1,21 @@
-from flask import Flask, render_template, request, jsonify, send_file
-from scraper import ECourtsScraper
+from flask import Flask, Response, g, render_template, request, jsonify, send_file
+from werkzeug.security import safe_join
+from scraper import get_scraper
+from jobs import QUEUED, RUNNING, get_job_queue
+from merged_export import MergedExport
+from metrics import STATE_GAUGE, TRACE_ALL, registry
+from prefetch import PREFETCH_ENABLED, get_prefetcher
+from search_index import artifact_source, get_search_index
+import atexit
+import gzip
+import hashlib
+import json
 import os
+import re
 from datetime import datetime
 import logging
+import threading
+import time
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -10,6 +23,40 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'ecourts-scraper-2024'
+# Let a fronting nginx/Apache send files itself (X-Sendfile) when enabled
+app.config['USE_X_SENDFILE'] = os.environ.get('ECOURTS_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+DOWNLOADS_DIR = os.path.abspath('downloads')
+# Files outside the artifact store that /download may serve: generated cause lists and exports
+DOWNLOAD_NAME = re.compile(r'^(?:causelist|cause_list|export)_[^/\\]+\.(?:pdf|json)$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Hierarchy responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+# Also load every state's districts when warming up (one upstream call per state)
+PRELOAD_DISTRICTS = os.environ.get('ECOURTS_PRELOAD_DISTRICTS', '').lower() in ('1', 'true', 'yes')
+
+_shutdown_lock = threading.Lock()
+_shut_down = False
+
+@app.before_request
+def start_trace():
+    if TRACE_ALL or request.args.get('trace'):
+        g.tracing = True
+        g.trace_started = time.perf_counter()
+        registry.start_trace()
+
+@app.after_request
+def finish_trace(response):
+    if g.get('tracing'):
+        stages = registry.finish_trace()
+        total = time.perf_counter() - g.trace_started
+        summary = ' '.join(f"{name}={seconds * 1000:.1f}ms" for name, _, seconds in stages)
+        logger.info(f"trace {request.method} {request.path} total={total * 1000:.1f}ms {summary}")
+        response.headers['Server-Timing'] = ', '.join(
+            [f"{name};dur={seconds * 1000:.1f}" for name, _, seconds in stages]
+            + [f"total;dur={total * 1000:.1f}"]
+        )
+    return response
 
 @app.route('/')
 def index():
@@ -19,7 +66,7 @@ def index():
 def get_states():
     """Get available states"""
     try:
-        scraper = ECourtsScraper()
+        scraper = get_scraper()
         states = scraper.get_states()
         return jsonify({'success': True, 'data': states})
     except Exception as e:
@@ -30,7 +77,7 @@ def get_states():
 def get_districts(state):
     """Get districts for a state"""
     try:
-        scraper = ECourtsScraper()
+        scraper = get_scraper()
         districts = scraper.get_districts(state)
         return jsonify({'success': True, 'data': districts})
     except Exception as e:
@@ -41,13 +88,51 @@ def get_districts(state):
 def get_court_complexes(state, district):
     """Get court complexes for a district"""
     try:
-        scraper = ECourtsScraper()
+        scraper = get_scraper()
         complexes = scraper.get_court_complexes(state, district)
         return jsonify({'success': True, 'data': complexes})
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/courts/<state>/<district>/<court_complex>')
+def get_courts(state, district, court_complex):
+    """Get courts inside a court complex"""
+    try:
+        scraper = get_scraper()
+        courts = scraper.get_courts(state, district, court_complex)
+        return jsonify({'success': True, 'data': courts})
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/hierarchy/<state>')
+def get_hierarchy(state):
+    """Every district, complex and court of a state in one response.
+
+    The version (also the ETag) is a hash of the tree, so clients can keep
+    a copy and revalidate it with If-None-Match for a 304.
+    """
+    try:
+        tree = get_scraper().get_hierarchy(state)
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+    encoded = json.dumps(tree, separators=(',', ':'), ensure_ascii=False)
+    version = hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:20]
+    body = f'{{"success":true,"state":{json.dumps(state, ensure_ascii=False)},' \
+           f'"version":"{version}","districts":{encoded}}}'.encode('utf-8')
+    response = Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    # Weak, so the plain and gzipped bodies revalidate against the same version
+    response.set_etag(version, weak=True)
+    if len(body) >= GZIP_MIN_BYTES and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response.make_conditional(request)
+
 @app.route('/api/download-causelist', methods=['POST'])
 def download_causelist():
     """Download cause list PDF"""
@@ -67,26 +152,227 @@ def download_causelist():
         except ValueError:
             return jsonify({'success': False, 'error': 'Invalid date format. Use DD-MM-YYYY'})
         
-        scraper = ECourtsScraper()
-        result = scraper.download_cause_list(state, district, court_complex, date_str)
+        if PREFETCH_ENABLED:
+            # Demand drives which complexes get pre-fetched overnight
+            try:
+                get_prefetcher().record(state, district, court_complex)
+            except Exception as e:
+                logger.error(f"Recording demand failed: {str(e)}")
+        
+        job_id = get_job_queue().submit(
+            download_and_index, state, district, court_complex, date_str
+        )
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/api/status/{job_id}'
+        })
+        
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+def download_and_index(state, district, court_complex, date_str):
+    """Download a cause list, then add its entries to the search index"""
+    scraper = get_scraper()
+    result = scraper.download_cause_list(state, district, court_complex, date_str)
+    if result.get('success'):
+        try:
+            path = scraper.result_path(result)
+            if path:
+                metadata = {'state': state, 'district': district,
+                            'court_complex': court_complex, 'date': date_str}
+                get_search_index().ingest_file(
+                    path, metadata, source=artifact_source(state, district, court_complex, date_str)
+                )
+        except Exception as e:
+            logger.error(f"Indexing {result.get('filename')} failed: {str(e)}")
+    return result
+
+@app.route('/api/export-causelist', methods=['POST'])
+def export_causelist():
+    """Queue one merged cause list for several complexes and a date range"""
+    try:
+        data = request.json or {}
+        state = data.get('state')
+        start_date = data.get('date')
+        days = int(data.get('days', 1))
+        fmt = data.get('format', 'pdf')
+        # Items are complex names (in `district`) or {"district": ..., "court_complex": ...}
+        complexes = []
+        for item in data.get('court_complexes') or []:
+            if isinstance(item, dict):
+                complexes.append((item.get('district') or data.get('district'), item.get('court_complex')))
+            else:
+                complexes.append((data.get('district'), item))
         
-        return jsonify(result)
+        if not state or not start_date or not complexes or not all(d and c for d, c in complexes):
+            return jsonify({'success': False, 'error': 'State, date, districts and court complexes are required'})
+        try:
+            datetime.strptime(start_date, '%d-%m-%Y')
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid date format. Use DD-MM-YYYY'})
+        if days < 1:
+            return jsonify({'success': False, 'error': 'days must be at least 1'})
         
+        exporter = MergedExport(get_scraper())
+        job_id = get_job_queue().submit(exporter.export, state, complexes, start_date, days, fmt,
+                                        message='Queued export')
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/api/status/{job_id}'
+        })
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/search')
+def search():
+    """Search indexed cause list entries (paginated)"""
+    args = request.args
+    try:
+        data = get_search_index().search(
+            q=args.get('q'), case_number=args.get('case_number'), party=args.get('party'),
+            judge=args.get('judge'), court_room=args.get('court_room'),
+            date_from=args.get('from'), date_to=args.get('to'),
+            state=args.get('state'), district=args.get('district'),
+            court_complex=args.get('court_complex'),
+            page=args.get('page', 1, type=int), per_page=args.get('per_page', 20, type=int),
+        )
+        return jsonify({'success': True, **data})
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/api/status/<job_id>')
+def job_status(job_id):
+    """Report progress of a queued cause list download"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    return jsonify({'success': True, **job})
+
 @app.route('/download/<filename>')
 def download_file(filename):
-    """Serve downloaded files"""
+    """Serve downloaded files (conditional GET and Range aware)"""
     try:
-        file_path = os.path.join('downloads', filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
+        store = get_scraper().store
+        if store is not None:
+            blob_path, download_name = store.lookup_blob(filename)
+            if blob_path:
+                # Blob names are content hashes, so the file can never change
+                response = send_file(
+                    blob_path, as_attachment=True, download_name=download_name,
+                    conditional=True, etag=filename.split('.', 1)[0],
+                    max_age=IMMUTABLE_MAX_AGE
+                )
+                response.cache_control.immutable = True
+                response.cache_control.public = True
+                return response
+        
+        if not DOWNLOAD_NAME.match(filename):
+            return jsonify({'error': 'File not found'}), 404
+        file_path = safe_join(DOWNLOADS_DIR, filename)
+        if file_path and os.path.isfile(file_path):
+            return send_file(file_path, as_attachment=True, conditional=True)
         return jsonify({'error': 'File not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics"""
+    scraper = get_scraper()
+    stats = scraper.pool_stats()
+    STATE_GAUGE.set(stats.get('in_flight', 0), kind='http_in_flight')
+    STATE_GAUGE.set(stats.get('requests', 0), kind='http_requests')
+    for status, count in get_job_queue().counts().items():
+        STATE_GAUGE.set(count, kind='jobs', status=status)
+    if scraper.store is not None:
+        STATE_GAUGE.set(scraper.store.stats()['bytes'], kind='store_bytes')
+    render = scraper.renderer.stats()
+    STATE_GAUGE.set(render['pages'], kind='rendered_pages')
+    STATE_GAUGE.set(render['pages_per_second'], kind='render_pages_per_second')
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/pool-stats')
+def pool_stats():
+    """Connection pool metrics for the shared scraper"""
+    return jsonify({'success': True, 'data': get_scraper().pool_stats()})
+
+@app.route('/api/prefetch')
+def prefetch_stats():
+    """Most requested complexes and the last pre-fetch run"""
+    if not PREFETCH_ENABLED:
+        return jsonify({'success': False, 'error': 'Pre-fetching is disabled'})
+    prefetcher = get_prefetcher()
+    return jsonify({'success': True, 'data': dict(prefetcher.stats(), top=prefetcher.top())})
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Drop cached hierarchy data (optionally one level/key)"""
+    data = request.get_json(silent=True) or {}
+    scraper = get_scraper()
+    if scraper.cache is None:
+        return jsonify({'success': False, 'error': 'Hierarchy cache is disabled'})
+    scraper.cache.invalidate(data.get('level'), data.get('key'))
+    return jsonify({'success': True, 'data': scraper.cache.stats()})
+
+def warm_up():
+    """Build the shared scraper and load the hierarchy before serving.
+
+    Under gunicorn's preload_app this runs once in the master, so forked
+    workers start with the imports and hierarchy already in memory.
+    """
+    started = time.perf_counter()
+    os.makedirs('downloads', exist_ok=True)
+    scraper = get_scraper()
+    states = scraper.get_states()
+    if PRELOAD_DISTRICTS:
+        for state in states:
+            try:
+                scraper.get_districts(state['name'])
+            except Exception as e:
+                logger.error(f"Preloading districts for {state['name']} failed: {str(e)}")
+    logger.info(f"Warmed up {len(states)} states in {time.perf_counter() - started:.2f}s")
+    return scraper
+
+def shutdown():
+    """Finish queued and running jobs, then release pools (safe to call twice)"""
+    global _shut_down
+    with _shutdown_lock:
+        if _shut_down:
+            return
+        _shut_down = True
+    if PREFETCH_ENABLED:
+        get_prefetcher().stop()
+    queue = get_job_queue()
+    counts = queue.counts()
+    pending = counts[QUEUED] + counts[RUNNING]
+    if pending:
+        logger.info(f"Draining {pending} jobs before exit")
+    started = time.perf_counter()
+    queue.shutdown(wait=True)
+    scraper = get_scraper()
+    scraper.renderer.close()
+    scraper.session.close()
+    logger.info(f"Shut down in {time.perf_counter() - started:.2f}s")
+
+def start_background():
+    """Start background schedulers in a serving process (after fork under gunicorn)"""
+    if PREFETCH_ENABLED:
+        get_prefetcher().start()
+
+def create_app(preload=True):
+    """Production entry point (see wsgi.py and gunicorn.conf.py)"""
+    if preload:
+        warm_up()
+    # Covers servers without a worker_exit hook; gunicorn calls shutdown() itself
+    atexit.register(shutdown)
+    return app
+
 if __name__ == '__main__':
     os.makedirs('downloads', exist_ok=True)
     print("🚀 eCourts Scraper running at: http://localhost:5000")
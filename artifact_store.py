@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from hierarchy_index import normalize_name
+
+logger = logging.getLogger(__name__)
+
+STORE_MAX_BYTES = int(os.environ.get('ECOURTS_STORE_MAX_BYTES', 1024 * 1024 * 1024))
+STORE_MAX_AGE = float(os.environ.get('ECOURTS_STORE_MAX_AGE_DAYS', 30)) * 24 * 3600
+
+STORE_ROOT = os.path.join('downloads', 'artifacts')
+# The index lives outside the blob directory so /download can never serve it
+STORE_INDEX_PATH = os.environ.get('ECOURTS_STORE_INDEX', os.path.join('data', 'artifacts.sqlite'))
+
+# Run eviction after this many stores
+EVICT_EVERY = 50
+
+BLOB_NAME = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    state TEXT NOT NULL,
+    district TEXT NOT NULL,
+    court_complex TEXT NOT NULL,
+    date TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs(hash),
+    filename TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (state, district, court_complex, date)
+);
+CREATE INDEX IF NOT EXISTS artifacts_hash ON artifacts(hash);
+'''
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Content-addressed store for downloaded cause lists.
+
+    Files live under `root` as <sha256>.<ext>, so identical content is
+    kept once. A SQLite index at index_path (give one outside `root` when
+    root is served) maps (state, district, complex, date) to the blob and
+    a friendly download filename; only names listed in it are blobs.
+    Eviction drops entries older than max_age, then least recently used
+    blobs until the store fits in max_bytes.
+    """
+
+    def __init__(self, root, max_bytes=STORE_MAX_BYTES, max_age=STORE_MAX_AGE, index_path=None):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.index_path = os.path.abspath(index_path or os.path.join(self.root, 'index.sqlite'))
+        os.makedirs(self.root, exist_ok=True)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        legacy = os.path.join(self.root, 'index.sqlite')
+        if self.index_path != legacy and os.path.exists(legacy) and not os.path.exists(self.index_path):
+            # Stores created before the index moved out of the blob directory
+            os.replace(legacy, self.index_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+        self._puts = 0
+
+    def reopen(self):
+        """New connection for a forked child; SQLite handles must not cross fork()"""
+        with self._lock:
+            self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+
+    @staticmethod
+    def _key(state, district, court_complex, date):
+        return (normalize_name(state), normalize_name(district), normalize_name(court_complex), date)
+
+    def blob_name(self, digest, ext):
+        return f"{digest}.{ext}"
+
+    def blob_path(self, blob_name):
+        """Absolute path for a blob file name, or None if it is not a stored blob"""
+        if not BLOB_NAME.match(blob_name):
+            return None
+        digest, ext = blob_name.split('.', 1)
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM blobs WHERE hash = ? AND ext = ?', (digest, ext)).fetchone()
+        if row is None:
+            return None
+        path = os.path.join(self.root, blob_name)
+        return path if os.path.isfile(path) else None
+
+    def _record(self, row):
+        blob = self.blob_name(row['hash'], row['ext'])
+        return {
+            'hash': row['hash'],
+            'blob': blob,
+            'path': os.path.join(self.root, blob),
+            'filename': row['filename'],
+            'size': row['size'],
+            'created_at': row['created_at'],
+        }
+
+    def lookup(self, state, district, court_complex, date):
+        """Return the stored record for a cause list, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT a.hash, a.filename, a.created_at, b.ext, b.size FROM artifacts a '
+                'JOIN blobs b ON b.hash = a.hash '
+                'WHERE a.state = ? AND a.district = ? AND a.court_complex = ? AND a.date = ?',
+                self._key(state, district, court_complex, date)
+            ).fetchone()
+            if row is None:
+                return None
+            if not os.path.isfile(os.path.join(self.root, self.blob_name(row['hash'], row['ext']))):
+                # Blob vanished from disk; forget the stale index entry
+                with self._conn:
+                    self._conn.execute('DELETE FROM artifacts WHERE hash = ?', (row['hash'],))
+                    self._conn.execute('DELETE FROM blobs WHERE hash = ?', (row['hash'],))
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE blobs SET last_access = ? WHERE hash = ?', (time.time(), row['hash']))
+            return self._record(row)
+
+    def lookup_blob(self, blob_name):
+        """Return (path, friendly filename) for a blob, or (None, None)"""
+        path = self.blob_path(blob_name)
+        if path is None:
+            return None, None
+        digest = blob_name.split('.', 1)[0]
+        with self._lock:
+            row = self._conn.execute('SELECT filename FROM artifacts WHERE hash = ? LIMIT 1', (digest,)).fetchone()
+            with self._conn:
+                self._conn.execute('UPDATE blobs SET last_access = ? WHERE hash = ?', (time.time(), digest))
+        return path, (row['filename'] if row else blob_name)
+
+    def artifacts_for_blob(self, blob_name):
+        """(state, district, court_complex, date) keys stored as this blob"""
+        digest = blob_name.split('.', 1)[0]
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT state, district, court_complex, date FROM artifacts WHERE hash = ?', (digest,)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def put(self, state, district, court_complex, date, src_path, filename):
+        """Move src_path into the store and index it; returns the record"""
+        digest = file_sha256(src_path)
+        ext = os.path.splitext(filename)[1].lstrip('.') or 'bin'
+        blob_path = os.path.join(self.root, self.blob_name(digest, ext))
+        size = os.path.getsize(src_path)
+        now = time.time()
+        with self._lock:
+            if os.path.exists(blob_path):
+                os.remove(src_path)
+            else:
+                os.replace(src_path, blob_path)
+            with self._conn:
+                self._conn.execute(
+                    'INSERT INTO blobs (hash, ext, size, created_at, last_access) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(hash) DO UPDATE SET last_access = excluded.last_access',
+                    (digest, ext, size, now, now)
+                )
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO artifacts '
+                    '(state, district, court_complex, date, hash, filename, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    self._key(state, district, court_complex, date) + (digest, filename, now)
+                )
+            self._puts += 1
+            evict_now = self._puts % EVICT_EVERY == 0
+        if evict_now:
+            self.evict()
+        return self.lookup(state, district, court_complex, date)
+
+    def evict(self):
+        """Apply the age and size limits; returns number of blobs removed"""
+        removed = 0
+        with self._lock:
+            with self._conn:
+                if self.max_age:
+                    self._conn.execute('DELETE FROM artifacts WHERE created_at < ?', (time.time() - self.max_age,))
+                total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+                rows = self._conn.execute(
+                    'SELECT b.hash, b.ext, b.size, '
+                    '(SELECT COUNT(*) FROM artifacts a WHERE a.hash = b.hash) AS refs '
+                    'FROM blobs b ORDER BY refs > 0, b.last_access'
+                ).fetchall()
+                for row in rows:
+                    if row['refs'] and total <= self.max_bytes:
+                        break
+                    self._conn.execute('DELETE FROM artifacts WHERE hash = ?', (row['hash'],))
+                    self._conn.execute('DELETE FROM blobs WHERE hash = ?', (row['hash'],))
+                    path = os.path.join(self.root, self.blob_name(row['hash'], row['ext']))
+                    if os.path.exists(path):
+                        os.remove(path)
+                    total -= row['size']
+                    removed += 1
+        if removed:
+            logger.info(f"Evicted {removed} cause list artifacts")
+        return removed
+
+    def stats(self):
+        with self._lock:
+            blobs, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+            artifacts = self._conn.execute('SELECT COUNT(*) FROM artifacts').fetchone()[0]
+        return {'blobs': blobs, 'artifacts': artifacts, 'bytes': size, 'max_bytes': self.max_bytes}
@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import time
+from functools import partial
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+from hierarchy_index import HierarchyIndex
+from metrics import FALLBACKS, LOOKUPS, RESPONSE_BYTES, STAGE_SECONDS, UPSTREAM_RESPONSES
+from pdf_renderer import get_pdf_renderer
+from rate_limiter import (
+    AdaptiveRateLimiter, CircuitBreaker, CircuitOpenError,
+    endpoint_key, host_key, retry_after_seconds,
+)
+from singleflight import SingleFlight
+from scraper import (
+    BASE_URL, DEFAULT_HEADERS, DISTRICT_ENDPOINTS, DISTRICT_PLACEHOLDERS, POOL_MAXSIZE,
+    ECourtsScraper, district_form, parse_options, parse_states,
+)
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 30
+
+
+class AsyncECourtsScraper(ECourtsScraper):
+    """asyncio counterpart of ECourtsScraper built on aiohttp.
+
+    Public methods have the same names and arguments as the sync scraper
+    but are coroutines. Fallback data, the hierarchy index and the
+    cache are shared with the sync implementation.
+    """
+
+    def __init__(self, session=None, cache=None, limit_per_host=POOL_MAXSIZE,
+                 limiter=None, breaker=None, store=None, base_url=None, renderer=None):
+        # The sync __init__ would build a requests session we never use
+        self.base_url = base_url or BASE_URL
+        self.cause_list_url = urljoin(self.base_url, "?p=cause_list")
+        self.session = session
+        self.limit_per_host = limit_per_host
+        self._owns_session = session is None
+        self.cache = cache
+        self.store = store
+        self.renderer = renderer if renderer is not None else get_pdf_renderer()
+        self.index = HierarchyIndex()
+        self.inflight = SingleFlight()
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        if cache is not None:
+            cache.add_listener(self._on_hierarchy_update)
+
+    async def __aenter__(self):
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _ensure_session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host)
+            self.session = aiohttp.ClientSession(
+                headers=DEFAULT_HEADERS,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            )
+        return self.session
+
+    async def close(self):
+        """Close the HTTP session if this scraper created it"""
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    def pool_stats(self):
+        return {
+            'rate_limits': self.limiter.stats(),
+            'circuits': self.breaker.stats(),
+        }
+
+    async def _request(self, method, url, **kwargs):
+        """Send a paced, circuit-checked request and return (status, text)"""
+        host = host_key(url)
+        endpoint = endpoint_key(url)
+        self.breaker.before(endpoint)
+        wait = self.limiter.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        session = await self._ensure_session()
+        started = time.monotonic()
+        path = urlparse(url).path
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                text = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            UPSTREAM_RESPONSES.inc(endpoint=path, status='error')
+            self.limiter.record(host, None, time.monotonic() - started)
+            self.breaker.record(endpoint, False)
+            raise
+        elapsed = time.monotonic() - started
+        STAGE_SECONDS.observe(elapsed, stage='http', endpoint=path)
+        UPSTREAM_RESPONSES.inc(endpoint=path, status=response.status)
+        RESPONSE_BYTES.observe(len(text), endpoint=path)
+        self.limiter.record(host, response.status, elapsed,
+                            retry_after_seconds(response.headers))
+        self.breaker.record(endpoint, response.status < 400)
+        return response.status, text
+
+    async def get_page(self, url):
+        """Get page content with error handling"""
+        try:
+            status, text = await self._request('GET', url)
+            if status >= 400:
+                raise aiohttp.ClientResponseError(None, (), status=status)
+            return text
+        except Exception as e:
+            logger.error(f"Request failed: {str(e)}")
+            return None
+
+    async def get_states(self):
+        """Extract states from the cause list page"""
+        LOOKUPS.inc(level='states')
+        states = await self._cached('states', 'all', self._fetch_states)
+        if not states:
+            FALLBACKS.inc(level='states')
+            states = self._get_fallback_states()
+            if not self.index.has_states():
+                self.index.load_states(states)
+        return states
+
+    async def _fetch_states(self):
+        """Fetch states from upstream, returning None on failure"""
+        html = await self.get_page(self.cause_list_url)
+        if not html:
+            return None
+        states = parse_states(html)
+        if states is None:
+            logger.warning("State dropdown not found, using fallback data")
+            return None
+        logger.info(f"Found {len(states)} states")
+        return states or None
+
+    async def get_districts(self, state_name):
+        """Get districts for a state"""
+        LOOKUPS.inc(level='districts')
+        state_value = await self.resolve_state(state_name)
+        if not state_value:
+            logger.warning(f"State value not found for {state_name}")
+            FALLBACKS.inc(level='districts')
+            return self._get_fallback_districts(state_name)
+
+        canonical_name = self.index.state_name(state_value) or state_name
+        districts = await self._cached(
+            'districts', state_value,
+            lambda: self._try_ajax_districts(state_value, canonical_name)
+        )
+        if not districts:
+            FALLBACKS.inc(level='districts')
+            districts = self._get_fallback_districts(canonical_name)
+            self.index.load_districts(state_value, districts)
+        return districts
+
+    async def resolve_state(self, state_name):
+        """Map a state name (any case/spacing) to its eCourts code"""
+        if not self.index.has_states():
+            self.index.load_states(await self.get_states())
+        return self.index.state_code(state_name)
+
+    async def resolve_district(self, state_name, district_name):
+        """Map a (state, district) name pair to (state_code, district_code)"""
+        state_value = await self.resolve_state(state_name)
+        if not state_value:
+            return None, None
+        if not self.index.has_districts(state_value):
+            await self.get_districts(state_name)
+        return state_value, self.index.district_code(state_value, district_name)
+
+    async def resolve_court_complex(self, state_name, district_name, complex_name):
+        """Map names to (state_code, district_code, complex_code)"""
+        state_value, district_value = await self.resolve_district(state_name, district_name)
+        if not district_value:
+            return state_value, None, None
+        if not self.index.has_complexes(state_value, district_value):
+            await self.get_court_complexes(state_name, district_name)
+        return state_value, district_value, self.index.complex_code(state_value, district_value, complex_name)
+
+    async def _cached(self, level, key, loader):
+        """Run loader through the hierarchy cache when one is configured"""
+        if self.cache is None:
+            value = await loader()
+            if value:
+                self._on_hierarchy_update(level, key, value)
+            return value
+        value = await self.cache.get_or_load_async(level, key, loader)
+        self._ensure_indexed(level, key, value)
+        return value
+
+    async def _probe_district_endpoint(self, endpoint, data):
+        status, text = await self._request('POST', endpoint, data=data)
+        if status != 200:
+            return None
+        return parse_options(text, DISTRICT_PLACEHOLDERS) or None
+
+    async def _try_ajax_districts(self, state_value, state_name):
+        """Race the district AJAX endpoints; the first non-empty answer wins"""
+        data = district_form(state_value, state_name)
+        tasks = [
+            asyncio.ensure_future(self._probe_district_endpoint(urljoin(self.base_url, path), data))
+            for path in DISTRICT_ENDPOINTS
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                try:
+                    districts = await finished
+                except CircuitOpenError as e:
+                    logger.debug(str(e))
+                    continue
+                except Exception as e:
+                    logger.warning(f"District endpoint probe failed: {str(e)}")
+                    continue
+                if districts:
+                    logger.info(f"Found {len(districts)} districts via AJAX")
+                    return districts
+            return None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_court_complexes(self, state_name, district_name):
+        """Get court complexes for a district"""
+        LOOKUPS.inc(level='complexes')
+        FALLBACKS.inc(level='complexes')
+        complexes = self._get_fallback_complexes()
+        state_value, district_value = await self.resolve_district(state_name, district_name)
+        if district_value and not self.index.has_complexes(state_value, district_value):
+            self.index.load_complexes(state_value, district_value, complexes)
+        return complexes
+
+    async def get_courts(self, state_name, district_name, complex_name):
+        """Get the courts inside a court complex"""
+        return ECourtsScraper.get_courts(self, state_name, district_name, complex_name)
+
+    async def get_hierarchy(self, state_name):
+        """Districts, complexes and courts of one state as nested [name, value, children] lists"""
+        districts = await self.get_districts(state_name)
+
+        async def district_node(district):
+            complexes = []
+            for court_complex in await self.get_court_complexes(state_name, district['name']):
+                courts = await self.get_courts(state_name, district['name'], court_complex['name'])
+                complexes.append([court_complex['name'], court_complex['value'],
+                                  [[court['name'], court['value']] for court in courts]])
+            return [district['name'], district['value'], complexes]
+
+        return list(await asyncio.gather(*(district_node(district) for district in districts)))
+
+    async def download_cause_list(self, state_name, district_name, complex_name, date_str):
+        """Download cause list; file rendering runs in the default executor"""
+        loop = asyncio.get_running_loop()
+        render = partial(
+            ECourtsScraper.download_cause_list, self,
+            state_name, district_name, complex_name, date_str
+        )
+        return await loop.run_in_executor(None, render)
@@ -0,0 +1,102 @@
+"""Offline accuracy/latency benchmark for the local CAPTCHA solver.
+
+Trains on part of the labelled samples collected from solved CAPTCHAs and
+evaluates on the rest (every --holdout-th sample).
+
+    python benchmarks/bench_captcha.py [--samples DIR] [--holdout 5]
+        [--min-confidence 0.6] [--length 6] [--synthetic 300]
+
+--synthetic renders random noisy strings instead, to exercise the
+pipeline when no real samples have been collected yet.
+"""
+import argparse
+import io
+import os
+import random
+import string
+import sys
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from captcha_solver import (  # noqa: E402
+    CAPTCHA_LENGTH, MIN_CONFIDENCE, SAMPLES_DIR, CaptchaSolver, SampleCollector, train,
+)
+
+ALPHABET = string.ascii_lowercase + string.digits
+
+
+def synthetic_captcha(text, rng):
+    """Dark text on a light noisy background, roughly like the site's images"""
+    font = ImageFont.load_default()
+    image = Image.new('L', (12 * len(text) + 16, 30), 235)
+    draw = ImageDraw.Draw(image)
+    for _ in range(120):
+        draw.point((rng.randrange(image.width), rng.randrange(image.height)), fill=rng.randrange(80, 200))
+    for index, char in enumerate(text):
+        draw.text((8 + 12 * index, 8 + rng.randint(-2, 2)), char, fill=20, font=font)
+    buffer = io.BytesIO()
+    image.resize((image.width * 2, image.height * 2)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def synthetic_samples(count, length=5, seed=1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = ''.join(rng.choice(ALPHABET) for _ in range(length))
+        yield synthetic_captcha(text, rng), text
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))] if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', default=SAMPLES_DIR)
+    parser.add_argument('--holdout', type=int, default=5, help='Every Nth sample is held out for testing')
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE)
+    parser.add_argument('--length', type=int, default=CAPTCHA_LENGTH, help='Characters per CAPTCHA, if fixed')
+    parser.add_argument('--synthetic', type=int, default=0, help='Use N generated samples instead')
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        samples = list(synthetic_samples(args.synthetic, length=args.length or 5))
+    else:
+        samples = list(SampleCollector(args.samples).samples())
+    if len(samples) < args.holdout:
+        print(f"Only {len(samples)} samples in {args.samples}; solve some CAPTCHAs or pass --synthetic N")
+        return
+
+    training = [sample for i, sample in enumerate(samples) if i % args.holdout]
+    testing = [sample for i, sample in enumerate(samples) if not i % args.holdout]
+    classifier = train(training)
+    solver = CaptchaSolver(classifier, min_confidence=args.min_confidence, length=args.length)
+
+    exact = chars = total_chars = accepted = accepted_right = 0
+    latencies = []
+    for png_bytes, label in testing:
+        result = solver.solve(png_bytes)
+        latencies.append(result['seconds'])
+        text = result['text'] or ''
+        right = text == label
+        exact += right
+        chars += sum(a == b for a, b in zip(text, label))
+        total_chars += len(label)
+        if result['accepted']:
+            accepted += 1
+            accepted_right += right
+
+    print(f"train: {len(training)} samples ({len(classifier)} glyphs), test: {len(testing)} samples")
+    print(f"exact accuracy:     {exact / len(testing):.1%}")
+    print(f"character accuracy: {chars / max(total_chars, 1):.1%}")
+    print(f"auto-solved:        {accepted / len(testing):.1%} (confidence >= {args.min_confidence}), "
+          f"{accepted_right / max(accepted, 1):.1%} of those correct")
+    print(f"solve latency:      p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+          f"p90 {percentile(latencies, 0.9) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
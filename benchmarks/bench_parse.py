@@ -0,0 +1,88 @@
+"""Micro-benchmark: per-page parse time of the state/district dropdowns.
+
+Compares the original full-DOM html.parser approach with the strained
+parser used by scraper.parse_states/parse_options.
+
+    python benchmarks/bench_parse.py [--repeat N] [--page FILE]
+"""
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import synthetic_page  # noqa: E402
+from scraper import (  # noqa: E402
+    DISTRICT_PLACEHOLDERS, HTML_PARSER, STATE_PLACEHOLDERS, STATE_SELECTORS,
+    parse_options, parse_states,
+)
+
+
+def legacy_parse_states(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    for selector in STATE_SELECTORS:
+        state_select = soup.select_one(selector)
+        if state_select:
+            return [
+                {'name': o.get_text(strip=True), 'value': o.get('value', '').strip()}
+                for o in state_select.find_all('option')
+                if o.get('value', '').strip() and o.get_text(strip=True) not in STATE_PLACEHOLDERS
+            ]
+    return None
+
+
+def legacy_parse_options(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [
+        {'name': o.get_text(strip=True), 'value': o.get('value', '').strip()}
+        for o in soup.find_all('option')
+        if o.get('value', '').strip() and o.get_text(strip=True) not in DISTRICT_PLACEHOLDERS
+    ]
+
+
+def timed(func, arg, repeat):
+    best = float('inf')
+    total = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - started
+        best = min(best, elapsed)
+        total += elapsed
+    return best, total / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page', help='Saved cause list page to parse instead of the synthetic one')
+    args = parser.parse_args(argv)
+
+    if args.page:
+        with open(args.page, 'r', encoding='utf-8') as f:
+            page = f.read()
+    else:
+        page = synthetic_page()
+    fragment = ''.join(f'<option value="{i}">District {i}</option>' for i in range(60))
+
+    assert legacy_parse_states(page) == parse_states(page)
+    assert legacy_parse_options(fragment) == parse_options(fragment, DISTRICT_PLACEHOLDERS)
+
+    print(f"page: {len(page) / 1024:.0f} KiB, parser: {HTML_PARSER}, repeat: {args.repeat}")
+    print(f"{'case':<28}{'best ms':>10}{'mean ms':>10}")
+    for name, func, arg in [
+        ('states (html.parser, full)', legacy_parse_states, page),
+        ('states (strained)', parse_states, page),
+        ('districts (html.parser)', legacy_parse_options, fragment),
+        ('districts (strained)', lambda html: parse_options(html, DISTRICT_PLACEHOLDERS), fragment),
+    ]:
+        best, mean = timed(func, arg, args.repeat)
+        print(f"{name:<28}{best * 1000:>10.2f}{mean * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark cause list PDF rendering: in-process versus the process pool.
+
+    python benchmarks/bench_render.py [--documents 40] [--cases 300] [--workers 4]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_renderer import PdfRenderer  # noqa: E402
+from scraper import cause_list_job  # noqa: E402
+
+
+def jobs(out_dir, documents, cases):
+    lines = [
+        f"{i}. Case No: CS/{i}/2024 - Petitioner {i} with a fairly long cause title vs Respondent {i} and others"
+        for i in range(1, cases + 1)
+    ]
+    return [
+        cause_list_job(os.path.join(out_dir, f"doc{n}.pdf"), 'Delhi', 'New Delhi', f'Complex {n}', '10-10-2025', lines)
+        for n in range(documents)
+    ]
+
+
+def run(renderer, batch):
+    started = time.perf_counter()
+    pages = sum(count for _, count in renderer.render_many(batch))
+    return pages, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=40)
+    parser.add_argument('--cases', type=int, default=300, help='Cases per cause list')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    out_dir = tempfile.mkdtemp(prefix='ecourts-render-')
+    try:
+        print(f"{args.documents} documents x {args.cases} cases, cpus: {os.cpu_count()}")
+        print(f"{'renderer':<22}{'pages':>8}{'seconds':>10}{'pages/s':>10}")
+        for name, renderer in [('in-process', PdfRenderer(workers=0)),
+                               (f'pool ({args.workers} workers)', PdfRenderer(workers=args.workers))]:
+            if renderer.workers:
+                # Start the workers (and build their templates) outside the timing
+                list(renderer.render_many(jobs(out_dir, renderer.workers, 1)))
+            pages, seconds = run(renderer, jobs(out_dir, args.documents, args.cases))
+            print(f"{name:<22}{pages:>8}{seconds:>10.2f}{pages / seconds:>10.1f}")
+            renderer.close()
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Record eCourts responses as replayable fixtures.
+
+    python benchmarks/fixtures.py record [--states 26 27] [--out DIR]
+    python benchmarks/fixtures.py synth [--out DIR]
+
+A fixture directory holds response bodies plus manifest.json mapping
+"METHOD /path[?state_code=N]" to a body file. standin_server.py serves
+them back.
+"""
+import argparse
+import json
+import os
+import sys
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import BASE_URL, DISTRICT_ENDPOINTS, PooledSession, district_form, parse_states  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+MANIFEST = 'manifest.json'
+
+
+def fixture_key(method, path, state_code=None):
+    key = f"{method.upper()} {path}"
+    return f"{key}?state_code={state_code}" if state_code else key
+
+
+def synthetic_page(rows=2000):
+    """A cause-list-like page: big layout/table body plus the state dropdown"""
+    states = ''.join(f'<option value="{i}">State {i}</option>' for i in range(1, 37))
+    body = ''.join(
+        f'<tr><td>{i}</td><td><a href="#c{i}">CA/{i}/2024</a></td><td>Petitioner {i} vs Respondent {i}</td></tr>'
+        for i in range(rows)
+    )
+    return (
+        '<html><head><script>var x = 1;</script><style>td { color: red; }</style></head><body>'
+        '<div id="nav"><ul>' + '<li><a href="#">Link</a></li>' * 200 + '</ul></div>'
+        '<form><select name="state_code"><option value="">Select State</option>' + states + '</select>'
+        '<select name="dist_code"><option value="">Select District</option></select></form>'
+        '<table>' + body + '</table></body></html>'
+    )
+
+
+def synthetic_districts(state_code, count=40):
+    return '<option value="">Select District</option>' + ''.join(
+        f'<option value="{state_code}{i:02d}">District {state_code}-{i}</option>' for i in range(count)
+    )
+
+
+def synthetic_fixtures(base_url=BASE_URL):
+    """In-memory fixtures (key -> body) mimicking the live site"""
+    base_path = urlparse(base_url).path
+    fixtures = {fixture_key('GET', base_path): synthetic_page()}
+    # Only the first endpoint answers, like the live site
+    endpoint = urlparse(urljoin(base_url, DISTRICT_ENDPOINTS[0])).path
+    for state_code in range(1, 37):
+        fixtures[fixture_key('POST', endpoint, str(state_code))] = synthetic_districts(state_code)
+    return fixtures
+
+
+def save_fixtures(fixtures, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {}
+    for index, (key, body) in enumerate(sorted(fixtures.items())):
+        filename = f"{index:03d}.html"
+        with open(os.path.join(out_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(body)
+        manifest[key] = filename
+    with open(os.path.join(out_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Load key -> body from a fixture directory, or synthetic ones if absent"""
+    manifest_path = os.path.join(fixtures_dir, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return synthetic_fixtures()
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    fixtures = {}
+    for key, filename in manifest.items():
+        with open(os.path.join(fixtures_dir, filename), 'r', encoding='utf-8') as f:
+            fixtures[key] = f.read()
+    return fixtures
+
+
+def record(base_url, state_codes=None, out_dir=FIXTURES_DIR):
+    """Fetch the live cause list page and district endpoints into fixtures"""
+    session = PooledSession()
+    base_path = urlparse(base_url).path
+    fixtures = {}
+
+    response = session.get(urljoin(base_url, '?p=cause_list'), timeout=30)
+    response.raise_for_status()
+    fixtures[fixture_key('GET', base_path)] = response.text
+
+    states = parse_states(response.text) or []
+    if state_codes:
+        states = [state for state in states if state['value'] in state_codes]
+    for state in states:
+        for path in DISTRICT_ENDPOINTS:
+            url = urljoin(base_url, path)
+            try:
+                reply = session.post(url, data=district_form(state['value'], state['name']), timeout=30)
+            except Exception as e:
+                print(f"skip {url} for {state['name']}: {e}", file=sys.stderr)
+                continue
+            if reply.status_code == 200 and reply.text.strip():
+                fixtures[fixture_key('POST', urlparse(url).path, state['value'])] = reply.text
+    manifest = save_fixtures(fixtures, out_dir)
+    print(f"Recorded {len(manifest)} fixtures into {out_dir}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record or generate eCourts fixtures')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help='Record responses from the live site')
+    record_parser.add_argument('--base-url', default=BASE_URL)
+    record_parser.add_argument('--states', nargs='*', help='State codes to record (default: all)')
+    record_parser.add_argument('--out', default=FIXTURES_DIR)
+    synth_parser = subparsers.add_parser('synth', help='Write synthetic fixtures')
+    synth_parser.add_argument('--out', default=FIXTURES_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record(args.base_url, args.states, args.out)
+    else:
+        manifest = save_fixtures(synthetic_fixtures(), args.out)
+        print(f"Wrote {len(manifest)} synthetic fixtures into {args.out}")
+
+
+if __name__ == '__main__':
+    main()
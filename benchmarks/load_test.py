@@ -0,0 +1,190 @@
+"""Load-test the production server (gunicorn, wsgi:app) at several worker/thread settings.
+
+    python benchmarks/load_test.py [--settings 1x4,1x16,2x8] [--concurrency 32]
+        [--duration 10] [--latency 0.05] [--json results.json]
+
+Each setting is WORKERSxTHREADS. The app is pointed at the stand-in
+eCourts server, started with `gunicorn -c gunicorn.conf.py wsgi:app`,
+loaded with a mix of hierarchy requests from --concurrency client
+threads, then stopped with SIGTERM. Reports req/s, latency percentiles,
+errors and how long the graceful shutdown took.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fixtures import FIXTURES_DIR, load_fixtures  # noqa: E402
+from run_benchmarks import percentile  # noqa: E402
+from standin_server import start_server  # noqa: E402
+
+STARTUP_TIMEOUT = 60
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def log_tail(path, lines=20):
+    with open(path, 'r', errors='replace') as f:
+        return ''.join(f.readlines()[-lines:])
+
+
+def start_gunicorn(workers, threads, upstream, workdir):
+    """Launch gunicorn in workdir; returns (process, base_url) once it answers.
+
+    Server output goes to workdir/gunicorn.log.
+    """
+    port = free_port()
+    env = dict(
+        os.environ,
+        ECOURTS_BASE_URL=upstream,
+        ECOURTS_BIND=f'127.0.0.1:{port}',
+        ECOURTS_WEB_WORKERS=str(workers),
+        ECOURTS_WEB_THREADS=str(threads),
+        # Measure the server, not the production pacing towards eCourts
+        ECOURTS_RATE_INITIAL='10000',
+        ECOURTS_RATE_MAX='10000',
+    )
+    command = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+               '--pythonpath', ROOT, '--log-level', 'warning', 'wsgi:app']
+    log_path = os.path.join(workdir, 'gunicorn.log')
+    with open(log_path, 'ab') as log:
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {process.returncode}:\n{log_tail(log_path)}")
+        try:
+            if requests.get(f'{base_url}/api/states', timeout=2).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('gunicorn did not start in time')
+
+
+def stop_gunicorn(process):
+    """SIGTERM and wait; returns the seconds the graceful shutdown took"""
+    started = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=STARTUP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    return time.perf_counter() - started
+
+
+def request_paths(base_url):
+    """States, districts and court complexes, spread over everything the stand-in knows"""
+    paths = ['/api/states']
+    states = requests.get(f'{base_url}/api/states', timeout=30).json().get('data', [])
+    for state in states:
+        paths.append(f"/api/districts/{state['name']}")
+        districts = requests.get(f"{base_url}/api/districts/{state['name']}", timeout=30).json().get('data', [])
+        paths.extend(f"/api/court-complexes/{state['name']}/{district['name']}" for district in districts[:3])
+    return paths
+
+
+def load(base_url, paths, concurrency, duration):
+    """Hit paths round-robin from `concurrency` threads for `duration` seconds"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        nonlocal errors
+        session = requests.Session()
+        i = offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += concurrency
+            started = time.perf_counter()
+            try:
+                ok = session.get(base_url + path, timeout=60).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += not ok
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': len(latencies) / wall if wall else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p90_ms': percentile(latencies, 0.90) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def parse_settings(text):
+    settings = []
+    for item in text.split(','):
+        workers, _, threads = item.strip().lower().partition('x')
+        settings.append((int(workers), int(threads or 1)))
+    return settings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--settings', default='1x1,1x4,1x16,2x8', help='Comma-separated WORKERSxTHREADS')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0.05, help='Stand-in upstream delay per request')
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args(argv)
+
+    server = start_server(load_fixtures(args.fixtures), latency=args.latency)
+    results = []
+    print(f"{'setting':<10}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'err':>6}{'stop s':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for workers, threads in parse_settings(args.settings):
+            process, base_url = start_gunicorn(workers, threads, server.base_url, workdir)
+            try:
+                paths = request_paths(base_url)
+                result = load(base_url, paths, args.concurrency, args.duration)
+            finally:
+                stop_seconds = stop_gunicorn(process)
+            result.update(setting=f'{workers}x{threads}', workers=workers, threads=threads,
+                          concurrency=args.concurrency, shutdown_s=stop_seconds)
+            results.append(result)
+            print(f"{result['setting']:<10}{result['throughput_rps']:>9.1f}{result['p50_ms']:>9.1f}"
+                  f"{result['p90_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['errors']:>6}{stop_seconds:>8.2f}")
+    server.shutdown()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
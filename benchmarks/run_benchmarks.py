@@ -0,0 +1,234 @@
+"""Benchmark ECourtsScraper and the Flask routes against the stand-in server.
+
+    python benchmarks/run_benchmarks.py [--requests 200] [--concurrency 8]
+        [--latency 0.02] [--error-rate 0] [--json results.json]
+
+Reports latency percentiles, throughput and peak Python memory per case
+(memory is sampled in a separate sequential pass). With --browser, also
+loads the stand-in page in a pooled Chrome and reports how long the
+event-driven browser waits took versus the fixed sleeps they replaced.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+# Benchmarks measure our code, not the production pacing defaults
+os.environ.setdefault('ECOURTS_RATE_INITIAL', '10000')
+os.environ.setdefault('ECOURTS_RATE_MAX', '10000')
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fixtures import FIXTURES_DIR, load_fixtures  # noqa: E402
+from standin_server import start_server  # noqa: E402
+
+# Calls per case made under tracemalloc for the peak memory figure
+MEMORY_SAMPLES = 10
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(name, func, requests, concurrency):
+    """Call func(i) `requests` times over `concurrency` threads"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            func(i)
+            ok = True
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    # tracemalloc slows allocations down a lot, so measure memory separately
+    tracemalloc.start()
+    for i in range(min(requests, MEMORY_SAMPLES)):
+        try:
+            func(i)
+        except Exception:
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'case': name,
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p90_ms': percentile(latencies, 0.90) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'throughput_rps': requests / wall if wall else 0.0,
+        'peak_mem_kib': peak / 1024,
+    }
+
+
+def browser_cases(base_url):
+    """Page load plus network-idle wait in a real browser (needs Chrome)"""
+    from browser_pool import BrowserPool
+    from browser_waits import timed_wait, wait_for_network_idle
+
+    pool = BrowserPool(size=2)
+
+    def page_load(i):
+        browser = pool.checkout()
+        try:
+            browser.driver.get(base_url)
+            with timed_wait('page_load'):
+                wait_for_network_idle(browser.driver)
+        finally:
+            pool.checkin(browser)
+
+    return [('browser page load (stand-in)', page_load)], pool
+
+
+def build_cases(base_url):
+    """(name, func(i)) pairs; imports happen after the environment is set"""
+    import app as flask_app
+    from hierarchy_cache import HierarchyCache
+    from scraper import ECourtsScraper, PooledSession
+
+    session = PooledSession()
+    cold = ECourtsScraper(session=session, base_url=base_url)
+    warm = ECourtsScraper(session=session, cache=HierarchyCache(), base_url=base_url)
+    state_names = [state['name'] for state in cold.get_states()]
+
+    def cold_states(i):
+        cold.index.load_states([])
+        cold.get_states()
+
+    def cold_districts(i):
+        cold.get_districts(state_names[i % len(state_names)])
+
+    def warm_districts(i):
+        warm.get_districts(state_names[i % len(state_names)])
+
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, 'client'):
+            local.client = flask_app.app.test_client()
+        return local.client
+
+    def route(path_for):
+        def call(i):
+            response = client().get(path_for(i))
+            if response.status_code != 200 or not response.get_json().get('success'):
+                raise RuntimeError(f"{response.status_code}")
+        return call
+
+    # The cached cases measure hits only: fill the caches with every state
+    # first (a warm-up hit by --error-rate is simply loaded on first use)
+    warm_paths = ['/api/states'] + [f'/api/districts/{name}' for name in state_names]
+    for name in state_names:
+        warm.get_districts(name)
+    for path in warm_paths:
+        try:
+            route(lambda i: path)(0)
+        except RuntimeError:
+            pass
+
+    return [
+        ('scraper.get_states (cold)', cold_states),
+        ('scraper.get_districts (cold)', cold_districts),
+        ('scraper.get_districts (cached)', warm_districts),
+        ('GET /api/states', route(lambda i: '/api/states')),
+        ('GET /api/districts/<state>', route(lambda i: f'/api/districts/{state_names[i % len(state_names)]}')),
+    ]
+
+
+def print_table(results):
+    print(f"{'case':<34}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'req/s':>9}{'err':>5}{'peak KiB':>10}")
+    for r in results:
+        print(f"{r['case']:<34}{r['p50_ms']:>9.2f}{r['p90_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+              f"{r['throughput_rps']:>9.1f}{r['errors']:>5}{r['peak_mem_kib']:>10.0f}")
+
+
+def print_wait_report():
+    from browser_waits import wait_report
+
+    report = wait_report()
+    if not report:
+        return report
+    print(f"\n{'browser wait':<20}{'waits':>7}{'mean s':>9}{'fixed s':>9}{'saved s':>10}{'lost s':>9}{'net s':>9}")
+    for r in report:
+        print(f"{r['step']:<20}{r['waits']:>7}{r['mean_s']:>9.2f}{r['fixed_s']:>9.1f}{r['saved_s']:>10.1f}"
+              f"{r['lost_s']:>9.1f}{r['net_s']:>9.1f}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='eCourts scraper benchmarks')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--only', help='Run cases whose name contains this text')
+    parser.add_argument('--browser', action='store_true', help='Also run Selenium wait cases (needs Chrome)')
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args(argv)
+
+    server = start_server(
+        load_fixtures(args.fixtures),
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+    )
+    # The app reads this when it first builds its shared scraper
+    os.environ['ECOURTS_BASE_URL'] = server.base_url
+
+    cases = build_cases(server.base_url)
+    pool = None
+    if args.browser:
+        extra, pool = browser_cases(server.base_url)
+        cases += extra
+
+    results = []
+    for name, func in cases:
+        if args.only and args.only not in name:
+            continue
+        if name.startswith('browser'):
+            # Browsers are slow to drive; a handful of loads is enough
+            results.append(run_case(name, func, min(args.requests, 10), 2))
+        else:
+            results.append(run_case(name, func, args.requests, args.concurrency))
+
+    print(f"stand-in: {server.base_url} latency={args.latency}s error_rate={args.error_rate} "
+          f"upstream hits={server.hits}")
+    print_table(results)
+    waits = print_wait_report() if args.browser else []
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'cases': results, 'browser_waits': waits}, f, indent=2)
+    if pool is not None:
+        pool.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Local stand-in for services.ecourts.gov.in that replays fixtures.
+
+    python benchmarks/standin_server.py [--port 8765] [--latency 0.05]
+        [--jitter 0.02] [--error-rate 0.05] [--error-status 503]
+
+Point the app at it with ECOURTS_BASE_URL=http://127.0.0.1:8765/ecourtindia_v6/
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import FIXTURES_DIR, fixture_key, load_fixtures  # noqa: E402
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503):
+        super().__init__(address, FixtureHandler)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/ecourtindia_v6/"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b'', content_type='text/html; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve(self, method, state_code=None):
+        server = self.server
+        with server._lock:
+            server.hits += 1
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if server.error_rate and random.random() < server.error_rate:
+            return self._reply(server.error_status, b'injected error')
+
+        path = urlparse(self.path).path
+        body = server.fixtures.get(fixture_key(method, path, state_code))
+        if body is None:
+            body = server.fixtures.get(fixture_key(method, path))
+        if body is None:
+            return self._reply(404, b'no fixture')
+        self._reply(200, body.encode('utf-8'))
+
+    def do_GET(self):
+        self._serve('GET')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8')) if length else {}
+        state_code = (form.get('state_code') or [None])[0]
+        self._serve('POST', state_code)
+
+
+def start_server(fixtures=None, port=0, **options):
+    """Start a stand-in server on a background thread and return it"""
+    server = StandInServer(('127.0.0.1', port), fixtures or load_fixtures(), **options)
+    threading.Thread(target=server.serve_forever, name='standin-server', daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay eCourts fixtures locally')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0.0, help='Added delay per request (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra delay up to this (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(
+        ('127.0.0.1', args.port), load_fixtures(args.fixtures),
+        latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status,
+    )
+    print(f"Serving {len(server.fixtures)} fixtures at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
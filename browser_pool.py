@@ -0,0 +1,259 @@
+import logging
+import os
+import threading
+import time
+import uuid
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.environ.get('ECOURTS_BROWSER_POOL_SIZE', 2))
+# Recycle a browser after this many checkouts, or when its JS heap grows past the limit
+MAX_USES = int(os.environ.get('ECOURTS_BROWSER_MAX_USES', 50))
+MAX_HEAP_MB = int(os.environ.get('ECOURTS_BROWSER_MAX_HEAP_MB', 512))
+# A browser pinned to a CAPTCHA session is reclaimed after this many seconds
+AFFINITY_TTL = int(os.environ.get('ECOURTS_BROWSER_AFFINITY_TTL', 600))
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def chromedriver_path():
+    """Resolve ChromeDriver once per process instead of on every launch"""
+    global _driver_path
+    if _driver_path is None:
+        with _driver_path_lock:
+            if _driver_path is None:
+                _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+
+def create_driver(headless=False):
+    """Start a Chrome driver configured for the eCourts site"""
+    chrome_options = Options()
+
+    if headless:
+        chrome_options.add_argument('--headless')
+
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # Important for CAPTCHA handling
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-popup-blocking')
+    chrome_options.add_argument('--window-size=1200,800')
+
+    service = Service(chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    driver.set_page_load_timeout(45)
+    driver.set_script_timeout(30)
+    return driver
+
+
+class PooledBrowser:
+    """A driver plus pool bookkeeping and per-session state (e.g. pending CAPTCHA)"""
+
+    def __init__(self, driver):
+        self.id = uuid.uuid4().hex[:8]
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+        self.state = {}
+        self.session_id = None
+        self.pinned_at = None
+
+
+class BrowserPool:
+    """Bounded pool of warm browsers with checkout/checkin.
+
+    A browser can be pinned to a session id (pin) so the request that
+    answers a CAPTCHA gets the same browser that displayed it
+    (checkout(session_id=...)). Browsers are health-checked on checkin
+    and recycled after max_uses checkouts or when their JS heap exceeds
+    max_heap_mb.
+    """
+
+    def __init__(self, size=POOL_SIZE, factory=None, headless=True,
+                 max_uses=MAX_USES, max_heap_mb=MAX_HEAP_MB, affinity_ttl=AFFINITY_TTL):
+        self.size = size
+        self.factory = factory or (lambda: create_driver(headless=headless))
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.affinity_ttl = affinity_ttl
+        self._idle = []
+        self._pinned = {}
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def warm(self, count=None):
+        """Start browsers ahead of demand (in the background)"""
+        def start():
+            for _ in range(count or self.size):
+                with self._cond:
+                    if self._total >= self.size or self._closed:
+                        return
+                    self._total += 1
+                browser = self._create()
+                with self._cond:
+                    if browser is not None:
+                        self._idle.append(browser)
+                    self._cond.notify()
+        threading.Thread(target=start, name='browser-pool-warm', daemon=True).start()
+
+    def _create(self):
+        try:
+            return PooledBrowser(self.factory())
+        except Exception as e:
+            logger.error(f"Failed to start browser: {str(e)}")
+            with self._cond:
+                self._total -= 1
+            return None
+
+    def checkout(self, session_id=None, timeout=60):
+        """Borrow a browser; with session_id, take the browser pinned to it (or None).
+
+        Taking a pinned browser unpins it, so a second request for the same
+        session gets None until the holder pins it again.
+        """
+        if session_id is not None:
+            with self._cond:
+                self._expire_pins()
+                browser = self._pinned.pop(session_id, None)
+                if browser is not None:
+                    browser.session_id = None
+                    browser.pinned_at = None
+                return browser
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._expire_pins()
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    browser = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    browser = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No browser available")
+                self._cond.wait(remaining)
+
+        if browser is None:
+            browser = self._create()
+            if browser is None:
+                raise RuntimeError("Could not start a browser")
+        browser.uses += 1
+        return browser
+
+    def pin(self, browser, session_id):
+        """Reserve a checked-out browser for a session (again, after a failed answer)"""
+        with self._cond:
+            browser.session_id = session_id
+            browser.pinned_at = time.time()
+            self._pinned[session_id] = browser
+
+    def checkin(self, browser):
+        """Return a browser (unpinning it); unhealthy or worn-out ones are replaced"""
+        with self._cond:
+            if browser.session_id is not None:
+                self._pinned.pop(browser.session_id, None)
+                browser.session_id = None
+                browser.pinned_at = None
+            elif browser in self._idle:
+                return
+        browser.state.clear()
+
+        if self._closed or not self._healthy(browser):
+            self._discard(browser)
+            return
+        with self._cond:
+            # An expired pin may already have put it back
+            if browser not in self._idle:
+                self._idle.append(browser)
+            self._cond.notify()
+
+    def _healthy(self, browser):
+        if browser.uses >= self.max_uses:
+            logger.info(f"Recycling browser {browser.id} after {browser.uses} uses")
+            return False
+        try:
+            heap = browser.driver.execute_script(
+                "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0"
+            ) or 0
+        except Exception as e:
+            logger.warning(f"Browser {browser.id} failed health check: {str(e)}")
+            return False
+        if heap > self.max_heap_mb * 1024 * 1024:
+            logger.info(f"Recycling browser {browser.id} using {heap / 1024 / 1024:.0f} MB JS heap")
+            return False
+        return True
+
+    def _discard(self, browser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing browser {browser.id}: {str(e)}")
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _expire_pins(self):
+        # Called with the condition held
+        if not self.affinity_ttl:
+            return
+        cutoff = time.time() - self.affinity_ttl
+        for session_id, browser in list(self._pinned.items()):
+            if browser.pinned_at < cutoff:
+                logger.info(f"Reclaiming browser {browser.id} from expired session")
+                del self._pinned[session_id]
+                browser.session_id = None
+                browser.pinned_at = None
+                browser.state.clear()
+                self._idle.append(browser)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'started': self._total,
+                'idle': len(self._idle),
+                'pinned': len(self._pinned),
+            }
+
+    def close(self):
+        """Quit every idle and pinned browser"""
+        with self._cond:
+            self._closed = True
+            browsers = self._idle + list(self._pinned.values())
+            self._idle = []
+            self._pinned = {}
+        for browser in browsers:
+            self._discard(browser)
+
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Process-wide browser pool"""
+    global _browser_pool
+    if _browser_pool is None:
+        with _browser_pool_lock:
+            if _browser_pool is None:
+                _browser_pool = BrowserPool()
+    return _browser_pool
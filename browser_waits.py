@@ -0,0 +1,138 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metrics import STAGE_SECONDS, WAIT_LOST, WAIT_SAVED, stage
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for any single wait; the page usually settles long before
+WAIT_TIMEOUT = float(os.environ.get('ECOURTS_WAIT_TIMEOUT', 10))
+# How long the network must stay quiet before the page counts as idle
+NETWORK_QUIET = float(os.environ.get('ECOURTS_WAIT_NETWORK_QUIET', 0.5))
+POLL_INTERVAL = 0.1
+
+# What each step used to sleep unconditionally
+FIXED_SLEEPS = {
+    'page_load': 3.0,
+    'captcha_refresh': 2.0,
+    'captcha_submit': 3.0,
+}
+
+# Resources requested so far plus in-flight jQuery AJAX calls
+_ACTIVITY_SCRIPT = (
+    "return [document.readyState,"
+    " (window.performance && performance.getEntriesByType) ? performance.getEntriesByType('resource').length : 0,"
+    " (window.jQuery && jQuery.active) || 0];"
+)
+
+
+@contextmanager
+def timed_wait(step):
+    """Time a wait as a browser_wait stage and count the time saved (or lost) versus FIXED_SLEEPS"""
+    started = time.perf_counter()
+    try:
+        with stage('browser_wait', step=step):
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        difference = FIXED_SLEEPS.get(step, 0.0) - elapsed
+        # Counters only grow, so waits slower than the old sleep are counted apart
+        if difference >= 0:
+            WAIT_SAVED.inc(difference, step=step)
+        else:
+            WAIT_LOST.inc(-difference, step=step)
+
+
+def _until(driver, condition, timeout, message):
+    """WebDriverWait that logs instead of raising when the bound is hit"""
+    try:
+        return WebDriverWait(driver, timeout or WAIT_TIMEOUT, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        logger.warning(f"Gave up waiting for {message} after {timeout or WAIT_TIMEOUT}s")
+        return False
+
+
+def wait_for_ready(driver, timeout=None):
+    """Wait until document.readyState is complete"""
+    return _until(
+        driver, lambda d: d.execute_script("return document.readyState") == 'complete',
+        timeout, 'document ready',
+    )
+
+
+def wait_for_network_idle(driver, timeout=None, quiet=NETWORK_QUIET):
+    """Wait until the page is loaded and no new requests start for `quiet` seconds"""
+    last = {'count': None, 'since': time.monotonic()}
+
+    def idle(d):
+        ready, resources, active = d.execute_script(_ACTIVITY_SCRIPT)
+        now = time.monotonic()
+        if ready != 'complete' or active or resources != last['count']:
+            last['count'] = resources
+            last['since'] = now
+            return False
+        return now - last['since'] >= quiet
+
+    return _until(driver, idle, timeout, 'network idle')
+
+
+def wait_for_staleness(driver, element, attribute=None, timeout=None):
+    """Wait until element is replaced, or (if given) its attribute changes value"""
+    try:
+        before = element.get_attribute(attribute) if attribute else None
+    except StaleElementReferenceException:
+        return True
+
+    def changed(d):
+        try:
+            return attribute is not None and element.get_attribute(attribute) != before
+        except StaleElementReferenceException:
+            return True
+
+    return _until(driver, changed, timeout, 'element change')
+
+
+def wait_for_url_change(driver, old_url, timeout=None):
+    return _until(driver, lambda d: d.current_url != old_url, timeout, 'URL change')
+
+
+def wait_for_any(driver, conditions, timeout=None):
+    """Wait until any of the given callables(driver) is truthy"""
+    def check(d):
+        for condition in conditions:
+            try:
+                if condition(d):
+                    return True
+            except StaleElementReferenceException:
+                return True
+        return False
+
+    return _until(driver, check, timeout, 'any condition')
+
+
+def wait_report():
+    """Per-step waits: count, mean wait, the old fixed sleep and total seconds saved and lost.
+
+    net_s is saved_s - lost_s; negative means the event-driven waits were
+    slower overall than the sleeps they replaced.
+    """
+    report = []
+    for step, fixed in FIXED_SLEEPS.items():
+        count = STAGE_SECONDS.count(stage='browser_wait', step=step)
+        if not count:
+            continue
+        report.append({
+            'step': step,
+            'waits': count,
+            'mean_s': STAGE_SECONDS.sum(stage='browser_wait', step=step) / count,
+            'fixed_s': fixed,
+            'saved_s': WAIT_SAVED.value(step=step),
+            'lost_s': WAIT_LOST.value(step=step),
+            'net_s': WAIT_SAVED.value(step=step) - WAIT_LOST.value(step=step),
+        })
+    return report
@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from scraper import BASE_URL, get_shared_session
+
+logger = logging.getLogger(__name__)
+
+# The site forgets a solved session after a period of inactivity; never trust one past MAX_AGE
+IDLE_TTL = int(os.environ.get('ECOURTS_CAPTCHA_IDLE_TTL', 15 * 60))
+MAX_AGE = int(os.environ.get('ECOURTS_CAPTCHA_MAX_AGE', 60 * 60))
+
+# Markers of the CAPTCHA interstitial in an HTML response
+CAPTCHA_MARKERS = ('captcha_image', 'securimage', 'fcaptcha_code', 'Invalid Captcha')
+
+
+def looks_like_captcha(html):
+    """True when a response is the CAPTCHA page rather than the content asked for"""
+    if not html:
+        return False
+    return any(marker in html for marker in CAPTCHA_MARKERS)
+
+
+class CaptchaSessionManager:
+    """Shares one CAPTCHA-authenticated site session between the browser and requests.
+
+    After a CAPTCHA is solved in Selenium, adopt(driver) copies the browser
+    cookies into the shared requests session, so CNR lookups and cause list
+    downloads run over plain HTTP without another solve. apply_to(driver)
+    copies them back into a fresh browser. The session is considered valid
+    until it idles for idle_ttl seconds, reaches max_age, a cookie expires,
+    or a response comes back as the CAPTCHA page.
+    """
+
+    def __init__(self, session=None, base_url=None, idle_ttl=IDLE_TTL, max_age=MAX_AGE):
+        self.session = session if session is not None else get_shared_session()
+        self.base_url = base_url or BASE_URL
+        self.domain = urlparse(self.base_url).hostname
+        self.idle_ttl = idle_ttl
+        self.max_age = max_age
+        self._solved_at = None
+        self._last_used = None
+        self._expires_at = None
+        self._uses = 0
+        self._solves = 0
+        self._lock = threading.Lock()
+
+    def adopt(self, driver):
+        """Take over the cookies of a browser that just passed the CAPTCHA"""
+        cookies = driver.get_cookies()
+        now = time.time()
+        with self._lock:
+            self._clear_cookies()
+            cookie_expiry = None
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain') or self.domain,
+                    path=cookie.get('path', '/'),
+                    secure=cookie.get('secure', False),
+                    expires=cookie.get('expiry'),
+                )
+                if cookie.get('expiry'):
+                    cookie_expiry = min(cookie_expiry or cookie['expiry'], cookie['expiry'])
+            self._solved_at = now
+            self._last_used = now
+            self._expires_at = cookie_expiry
+            self._uses = 0
+            self._solves += 1
+        logger.info(f"Adopted CAPTCHA session with {len(cookies)} cookies")
+
+    def apply_to(self, driver):
+        """Load the shared cookies into a browser; False if there is no valid session.
+
+        The driver must already be on the site's domain for the cookies to stick.
+        """
+        if not self.is_valid():
+            return False
+        with self._lock:
+            cookies = [cookie for cookie in self.session.cookies if self._ours(cookie)]
+        for cookie in cookies:
+            entry = {'name': cookie.name, 'value': cookie.value, 'path': cookie.path or '/'}
+            if cookie.expires:
+                entry['expiry'] = int(cookie.expires)
+            try:
+                driver.add_cookie(entry)
+            except Exception as e:
+                logger.warning(f"Could not copy cookie {cookie.name} to browser: {str(e)}")
+        return True
+
+    def is_valid(self):
+        with self._lock:
+            return self._valid(time.time())
+
+    def _valid(self, now):
+        if self._solved_at is None:
+            return False
+        if now - self._last_used > self.idle_ttl or now - self._solved_at > self.max_age:
+            return False
+        return self._expires_at is None or now < self._expires_at
+
+    def invalidate(self, reason=''):
+        """Forget the session (e.g. the site showed the CAPTCHA again)"""
+        with self._lock:
+            if self._solved_at is None:
+                return
+            self._solved_at = None
+            self._clear_cookies()
+        logger.info(f"CAPTCHA session invalidated {reason}".rstrip())
+
+    def request(self, method, url, **kwargs):
+        """Send a request over the authenticated session.
+
+        Returns None (and invalidates) when there is no valid session or the
+        site answers with the CAPTCHA page, so callers fall back to the browser.
+        """
+        if not self.is_valid():
+            return None
+        kwargs.setdefault('timeout', 30)
+        response = self.session.request(method, url, **kwargs)
+        if looks_like_captcha(response.text):
+            self.invalidate('(CAPTCHA page returned)')
+            return None
+        with self._lock:
+            self._last_used = time.time()
+            self._uses += 1
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {
+                'valid': self._valid(now),
+                'age': round(now - self._solved_at, 1) if self._solved_at else None,
+                'uses': self._uses,
+                'solves': self._solves,
+            }
+
+    def _ours(self, cookie):
+        return not cookie.domain or (self.domain or '').endswith(cookie.domain.lstrip('.'))
+
+    def _clear_cookies(self):
+        # Called with the lock held
+        for cookie in [cookie for cookie in self.session.cookies if self._ours(cookie)]:
+            self.session.cookies.clear(cookie.domain, cookie.path, cookie.name)
+
+
+_captcha_sessions = None
+_captcha_sessions_lock = threading.Lock()
+
+
+def get_captcha_sessions():
+    """Process-wide CAPTCHA session manager (backed by the shared pooled session)"""
+    global _captcha_sessions
+    if _captcha_sessions is None:
+        with _captcha_sessions_lock:
+            if _captcha_sessions is None:
+                _captcha_sessions = CaptchaSessionManager(base_url=os.environ.get('ECOURTS_BASE_URL'))
+    return _captcha_sessions
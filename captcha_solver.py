@@ -0,0 +1,304 @@
+"""Offline CAPTCHA solving: PIL/NumPy clean-up, glyph segmentation and a
+nearest-neighbour glyph classifier trained from manually solved samples.
+
+    python captcha_solver.py train [--samples DIR] [--model PATH]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+logger = logging.getLogger(__name__)
+
+# Training data and the model stay out of the served downloads/
+SAMPLES_DIR = os.environ.get('ECOURTS_CAPTCHA_SAMPLES', os.path.join('data', 'captcha_samples'))
+MODEL_PATH = os.environ.get('ECOURTS_CAPTCHA_MODEL', os.path.join('data', 'captcha_model.npz'))
+# Below this the answer goes to a human instead of the site
+MIN_CONFIDENCE = float(os.environ.get('ECOURTS_CAPTCHA_MIN_CONFIDENCE', 0.6))
+# Characters per CAPTCHA if fixed (0 = unknown); helps split touching glyphs
+CAPTCHA_LENGTH = int(os.environ.get('ECOURTS_CAPTCHA_LENGTH', 0)) or None
+
+GLYPH_SIZE = 16
+# Ink blobs narrower than this many columns are noise, not characters
+MIN_GLYPH_WIDTH = 2
+MIN_BLOB_PIXELS = 6
+LABELS_FILE = 'labels.jsonl'
+
+
+def _otsu_threshold(gray):
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    weights = np.cumsum(histogram)
+    means = np.cumsum(histogram * np.arange(256))
+    background = weights[:-1]
+    foreground = total - background
+    valid = (background > 0) & (foreground > 0)
+    mean_bg = np.where(valid, means[:-1] / np.maximum(background, 1), 0)
+    mean_fg = np.where(valid, (means[-1] - means[:-1]) / np.maximum(foreground, 1), 0)
+    variance = np.where(valid, background * foreground * (mean_bg - mean_fg) ** 2, 0)
+    return int(np.argmax(variance))
+
+
+def _drop_small_blobs(binary, min_pixels):
+    """Remove 8-connected ink blobs smaller than min_pixels (noise dots)"""
+    height, width = binary.shape
+    seen = np.zeros_like(binary)
+    keep = np.zeros_like(binary)
+    for y, x in zip(*np.nonzero(binary)):
+        if seen[y, x]:
+            continue
+        blob = [(y, x)]
+        seen[y, x] = True
+        index = 0
+        while index < len(blob):
+            cy, cx = blob[index]
+            index += 1
+            for ny in range(max(cy - 1, 0), min(cy + 2, height)):
+                for nx in range(max(cx - 1, 0), min(cx + 2, width)):
+                    if binary[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        blob.append((ny, nx))
+        if len(blob) >= min_pixels:
+            ys, xs = zip(*blob)
+            keep[list(ys), list(xs)] = True
+    return keep
+
+
+def preprocess(png_bytes):
+    """PNG bytes -> boolean ink mask (True = character pixel)"""
+    image = Image.open(io.BytesIO(png_bytes)).convert('L').filter(ImageFilter.MedianFilter(3))
+    gray = np.asarray(image, dtype=np.uint8)
+    low, high = np.percentile(gray, (2, 98))
+    if high > low:
+        gray = np.clip((gray.astype(np.float32) - low) * 255.0 / (high - low), 0, 255).astype(np.uint8)
+    binary = gray <= _otsu_threshold(gray)
+    # Dark backgrounds: characters are the minority class
+    if binary.mean() > 0.5:
+        binary = ~binary
+    return _drop_small_blobs(binary, max(MIN_BLOB_PIXELS, binary.size // 1000))
+
+
+def segment(binary, expected=None):
+    """Split an ink mask into per-character masks, left to right.
+
+    Uses the column projection; with `expected`, pieces are merged or
+    split until the count matches.
+    """
+    columns = binary.any(axis=0)
+    spans = []
+    start = None
+    for x, inked in enumerate(columns):
+        if inked and start is None:
+            start = x
+        elif not inked and start is not None:
+            spans.append([start, x])
+            start = None
+    if start is not None:
+        spans.append([start, len(columns)])
+    spans = [span for span in spans if span[1] - span[0] >= MIN_GLYPH_WIDTH]
+
+    if expected:
+        # Too many pieces: merge the narrowest into its closer neighbour
+        while len(spans) > expected:
+            narrowest = min(range(len(spans)), key=lambda i: spans[i][1] - spans[i][0])
+            if narrowest == 0:
+                other = 1
+            elif narrowest == len(spans) - 1:
+                other = narrowest - 1
+            else:
+                left_gap = spans[narrowest][0] - spans[narrowest - 1][1]
+                right_gap = spans[narrowest + 1][0] - spans[narrowest][1]
+                other = narrowest - 1 if left_gap <= right_gap else narrowest + 1
+            first, second = sorted((narrowest, other))
+            spans[first:second + 1] = [[spans[first][0], spans[second][1]]]
+        # Too few: split the widest (touching characters)
+        while 0 < len(spans) < expected:
+            widest = max(range(len(spans)), key=lambda i: spans[i][1] - spans[i][0])
+            left, right = spans[widest]
+            if right - left < 2 * MIN_GLYPH_WIDTH:
+                break
+            middle = (left + right) // 2
+            spans[widest:widest + 1] = [[left, middle], [middle, right]]
+
+    glyphs = []
+    for left, right in spans:
+        piece = binary[:, left:right]
+        rows = np.flatnonzero(piece.any(axis=1))
+        glyphs.append(piece[rows[0]:rows[-1] + 1] if rows.size else piece)
+    return glyphs
+
+
+def glyph_vector(glyph):
+    """Fixed-size, unit-length feature vector for one glyph mask"""
+    image = Image.fromarray((glyph * 255).astype(np.uint8)).resize((GLYPH_SIZE, GLYPH_SIZE), Image.BILINEAR)
+    vector = np.asarray(image, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class GlyphClassifier:
+    """k-nearest-neighbour classifier over glyph vectors"""
+
+    def __init__(self, vectors=None, labels=None, k=3):
+        self.vectors = vectors if vectors is not None else np.zeros((0, GLYPH_SIZE * GLYPH_SIZE), np.float32)
+        self.labels = labels if labels is not None else np.array([], dtype='<U1')
+        self.k = k
+
+    def __len__(self):
+        return len(self.labels)
+
+    def fit(self, vectors, labels):
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.labels = np.asarray(labels)
+        return self
+
+    def predict(self, vector):
+        """(label, confidence): vote share of the label among the k nearest samples,
+        scaled by how close the nearest one is"""
+        if not len(self):
+            return None, 0.0
+        similarity = self.vectors @ vector
+        nearest = np.argsort(similarity)[::-1][:self.k]
+        votes = {}
+        for index in nearest:
+            votes[self.labels[index]] = votes.get(self.labels[index], 0.0) + max(similarity[index], 0.0)
+        label = max(votes, key=votes.get)
+        total = sum(votes.values()) or 1.0
+        return str(label), float(votes[label] / total * max(similarity[nearest[0]], 0.0))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, vectors=self.vectors, labels=self.labels, k=self.k)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data['vectors'], data['labels'], int(data['k']))
+
+
+class CaptchaSolver:
+    """preprocess -> segment -> classify, with a confidence gate"""
+
+    def __init__(self, classifier=None, model_path=MODEL_PATH, min_confidence=MIN_CONFIDENCE,
+                 length=CAPTCHA_LENGTH):
+        if classifier is None:
+            classifier = GlyphClassifier.load(model_path) if os.path.exists(model_path) else GlyphClassifier()
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.length = length
+
+    def solve(self, png_bytes):
+        """Return {'text', 'confidence', 'accepted', 'seconds'}; text is None when no model"""
+        started = time.perf_counter()
+        text, confidence = None, 0.0
+        if len(self.classifier):
+            glyphs = segment(preprocess(png_bytes), self.length)
+            if glyphs and (not self.length or len(glyphs) == self.length):
+                predictions = [self.classifier.predict(glyph_vector(glyph)) for glyph in glyphs]
+                text = ''.join(label for label, _ in predictions)
+                # A CAPTCHA is only as good as its least certain character
+                confidence = min(score for _, score in predictions)
+        return {
+            'text': text,
+            'confidence': confidence,
+            'accepted': text is not None and confidence >= self.min_confidence,
+            'seconds': time.perf_counter() - started,
+        }
+
+
+class SampleCollector:
+    """Stores manually solved CAPTCHAs as labelled training/benchmark samples"""
+
+    def __init__(self, root=SAMPLES_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def add(self, png_bytes, label, source='manual'):
+        label = label.strip()
+        if not label:
+            return None
+        os.makedirs(self.root, exist_ok=True)
+        # The label is user input: it goes into labels.jsonl only, never into a path
+        filename = f"{int(time.time() * 1000)}_{uuid.uuid4().hex[:12]}.png"
+        with self._lock:
+            with open(os.path.join(self.root, filename), 'wb') as f:
+                f.write(png_bytes)
+            with open(os.path.join(self.root, LABELS_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'file': filename, 'label': label, 'source': source}) + '\n')
+        return filename
+
+    def samples(self):
+        """Yield (png_bytes, label)"""
+        index = os.path.join(self.root, LABELS_FILE)
+        if not os.path.exists(index):
+            return
+        with open(index, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if os.path.basename(record['file']) != record['file']:
+                    continue
+                path = os.path.join(self.root, record['file'])
+                if os.path.exists(path):
+                    with open(path, 'rb') as image:
+                        yield image.read(), record['label']
+
+
+def training_set(samples):
+    """Glyph vectors and labels from samples whose segmentation matches the label length"""
+    vectors, labels, skipped = [], [], 0
+    for png_bytes, label in samples:
+        glyphs = segment(preprocess(png_bytes), len(label))
+        if len(glyphs) != len(label):
+            skipped += 1
+            continue
+        vectors.extend(glyph_vector(glyph) for glyph in glyphs)
+        labels.extend(label)
+    return vectors, labels, skipped
+
+
+def train(samples, k=3):
+    vectors, labels, skipped = training_set(samples)
+    if skipped:
+        logger.info(f"Skipped {skipped} samples that did not segment cleanly")
+    return GlyphClassifier(k=k).fit(vectors, labels)
+
+
+_solver = None
+_solver_lock = threading.Lock()
+
+
+def get_captcha_solver():
+    """Process-wide solver loaded from MODEL_PATH (empty model if none trained yet)"""
+    global _solver
+    if _solver is None:
+        with _solver_lock:
+            if _solver is None:
+                _solver = CaptchaSolver()
+    return _solver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train the local CAPTCHA classifier')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    train_parser = subparsers.add_parser('train', help='Build a model from collected samples')
+    train_parser.add_argument('--samples', default=SAMPLES_DIR)
+    train_parser.add_argument('--model', default=MODEL_PATH)
+    train_parser.add_argument('-k', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    classifier = train(SampleCollector(args.samples).samples(), k=args.k)
+    classifier.save(args.model)
+    print(f"Trained on {len(classifier)} glyphs ({len(set(classifier.labels.tolist()))} classes) -> {args.model}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+"""Track case status by CNR and emit an event for every field that changes.
+
+    python case_tracker.py track CNR [CNR ...] [--interval HOURS]
+    python case_tracker.py check           # re-check everything that is due, once
+    python case_tracker.py run             # keep re-checking on schedule
+    python case_tracker.py events [--since ID]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from scraper import HTML_PARSER
+
+logger = logging.getLogger(__name__)
+
+# Tracked CNRs and their history are private: keep them out of the served downloads/
+TRACKER_PATH = os.environ.get('ECOURTS_TRACKER_PATH', os.path.join('data', 'case_tracker.sqlite'))
+CHECK_INTERVAL = float(os.environ.get('ECOURTS_TRACKER_INTERVAL_HOURS', 12)) * 3600
+# Failed checks back off up to this multiple of the interval
+MAX_BACKOFF = 8
+# A parse with fewer fields than this (besides the CNR) is an error page, not a case
+MIN_CASE_FIELDS = 3
+# Spread re-checks so thousands of CNRs tracked together are not due at once
+JITTER = 0.1
+
+CNR_SEARCH_PATH = "?p=cnr_status/searchByCNR/"
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cases (
+    cnr TEXT PRIMARY KEY,
+    content_hash TEXT,
+    state TEXT,
+    interval REAL NOT NULL,
+    added_at REAL NOT NULL,
+    last_checked REAL,
+    last_changed REAL,
+    next_check REAL NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS cases_next_check ON cases(next_check);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cnr TEXT NOT NULL,
+    field TEXT NOT NULL,
+    old TEXT,
+    new TEXT,
+    detected_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_cnr ON events(cnr);
+'''
+
+TABLE_STRAINER = SoupStrainer('table')
+_VOLATILE = re.compile(
+    r'<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->|<input\b[^>]*type=["\']?hidden[^>]*>',
+    re.IGNORECASE | re.DOTALL,
+)
+_SPACE = re.compile(r'\s+')
+
+
+def content_hash(html):
+    """Hash of the page with scripts, comments, hidden tokens and whitespace removed"""
+    cleaned = _SPACE.sub(' ', _VOLATILE.sub('', html or ''))
+    return hashlib.sha256(cleaned.encode('utf-8')).hexdigest()
+
+
+def field_name(label):
+    return re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_')
+
+
+def _cell_text(cell):
+    return _SPACE.sub(' ', cell.get_text(' ', strip=True)).strip()
+
+
+def parse_case_fields(soup):
+    """Case status tables -> {field: value}, plus 'history' (list of hearings).
+
+    Label/value rows (two or four cells) become fields; tables with a
+    header row become lists; petitioner/respondent tables become text.
+    """
+    fields = {}
+    for table in soup.find_all('table'):
+        classes = ' '.join(table.get('class', [])).lower()
+        rows = table.find_all('tr')
+        if 'petitioner' in classes or 'respondent' in classes:
+            key = 'petitioner' if 'petitioner' in classes else 'respondent'
+            fields[key] = ' '.join(_cell_text(row) for row in rows if _cell_text(row))
+            continue
+        header = rows[0].find_all('th') if rows else []
+        if len(header) > 2:
+            columns = [field_name(_cell_text(th)) for th in header]
+            entries = []
+            for row in rows[1:]:
+                cells = [_cell_text(td) for td in row.find_all('td')]
+                if cells:
+                    entries.append(dict(zip(columns, cells)))
+            fields['history' if 'hearing' in ' '.join(columns) else field_name(columns[0]) + '_list'] = entries
+            continue
+        for row in rows:
+            cells = [_cell_text(cell) for cell in row.find_all(['td', 'th'])]
+            for label, value in zip(cells[::2], cells[1::2]):
+                if label:
+                    fields[field_name(label)] = value
+    return fields
+
+
+def parse_case_html(html, cnr_number=None):
+    """Raw case status page -> fields (only the tables are parsed)"""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=TABLE_STRAINER)
+    fields = parse_case_fields(soup)
+    if cnr_number:
+        fields.setdefault('cnr_number', cnr_number)
+    return fields
+
+
+def diff_fields(old, new):
+    """[(field, old_value, new_value)] for every field that differs"""
+    changes = []
+    for key in sorted(set(old) | set(new)):
+        if old.get(key) != new.get(key):
+            changes.append((key, old.get(key), new.get(key)))
+    return changes
+
+
+def fetch_case_html(cnr_number, sessions=None):
+    """Case page over the shared CAPTCHA-authenticated session, or None if it needs a solve"""
+    from captcha_session import get_captcha_sessions
+
+    sessions = sessions or get_captcha_sessions()
+    response = sessions.post(sessions.base_url + CNR_SEARCH_PATH, data={'cino': cnr_number, 'ajax_req': 'true'})
+    if response is None or response.status_code != 200:
+        return None
+    return response.text
+
+
+def _encode(value):
+    return value if value is None or isinstance(value, str) else json.dumps(value, sort_keys=True)
+
+
+class CaseTracker:
+    """Last-seen case state in SQLite with scheduled, incremental re-checks.
+
+    Each check fetches the page and compares its content hash first, so
+    unchanged pages cost no parsing. Changed pages are parsed and diffed
+    field by field against the stored state, and each differing field is
+    recorded as an event and passed to listeners. The first check of a
+    case only records the baseline. A page that fails to parse, or parses
+    to next to nothing (an error or CAPTCHA page), counts as a failed
+    check: the stored state is kept and the case backs off.
+    """
+
+    def __init__(self, path=TRACKER_PATH, fetcher=fetch_case_html, parser=parse_case_html,
+                 interval=CHECK_INTERVAL):
+        self.fetcher = fetcher
+        self.parser = parser
+        self.interval = interval
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def add_listener(self, callback):
+        """Register callback(event) called for every change event"""
+        self._listeners.append(callback)
+
+    def track(self, cnrs, interval=None):
+        """Start tracking CNRs; they are checked on the next run"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO cases (cnr, interval, added_at, next_check) VALUES (?, ?, ?, ?)',
+                [(cnr.strip().upper(), interval or self.interval, now, now) for cnr in cnrs if cnr.strip()],
+            )
+
+    def untrack(self, cnr):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cases WHERE cnr = ?', (cnr.strip().upper(),))
+
+    def case(self, cnr):
+        """Last-seen state of a tracked case, or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM cases WHERE cnr = ?', (cnr.strip().upper(),)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record['state'] = json.loads(record['state']) if record['state'] else None
+        return record
+
+    def due(self, limit=100, now=None):
+        """CNRs whose next check time has passed, most overdue first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT cnr FROM cases WHERE next_check <= ? ORDER BY next_check LIMIT ?',
+                (now or time.time(), limit),
+            ).fetchall()
+        return [row['cnr'] for row in rows]
+
+    def _next_check(self, now, interval, failures):
+        delay = interval * min(2 ** failures, MAX_BACKOFF) if failures else interval
+        return now + delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def _record_failure(self, row, now):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE cases SET failures = failures + 1, next_check = ? WHERE cnr = ?',
+                (self._next_check(now, row['interval'], row['failures'] + 1), row['cnr']),
+            )
+
+    def check(self, cnr):
+        """Re-check one case; returns the list of change events (may be empty)"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM cases WHERE cnr = ?', (cnr,)).fetchone()
+        if row is None:
+            return []
+        now = time.time()
+        try:
+            html = self.fetcher(cnr)
+        except Exception as e:
+            logger.error(f"Case check for {cnr} failed: {str(e)}")
+            html = None
+        if html is None:
+            self._record_failure(row, now)
+            return []
+
+        digest = content_hash(html)
+        if digest == row['content_hash']:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    'UPDATE cases SET last_checked = ?, failures = 0, next_check = ? WHERE cnr = ?',
+                    (now, self._next_check(now, row['interval'], 0), cnr),
+                )
+            return []
+
+        try:
+            state = self.parser(html, cnr)
+        except Exception as e:
+            logger.error(f"Could not parse case page for {cnr}: {str(e)}")
+            state = None
+        if not state or len(set(state) - {'cnr_number'}) < MIN_CASE_FIELDS:
+            logger.warning(f"Case page for {cnr} has no case details; keeping the last state")
+            self._record_failure(row, now)
+            return []
+        previous = json.loads(row['state']) if row['state'] else None
+        changes = diff_fields(previous, state) if previous is not None else []
+        events = [
+            {'cnr': cnr, 'field': key, 'old': _encode(old), 'new': _encode(new), 'detected_at': now}
+            for key, old, new in changes
+        ]
+        with self._lock, self._conn:
+            for event in events:
+                cursor = self._conn.execute(
+                    'INSERT INTO events (cnr, field, old, new, detected_at) VALUES (?, ?, ?, ?, ?)',
+                    (cnr, event['field'], event['old'], event['new'], now),
+                )
+                event['id'] = cursor.lastrowid
+            self._conn.execute(
+                'UPDATE cases SET content_hash = ?, state = ?, last_checked = ?, failures = 0, next_check = ?'
+                + (', last_changed = ?' if events else '') + ' WHERE cnr = ?',
+                (digest, json.dumps(state, sort_keys=True), now, self._next_check(now, row['interval'], 0))
+                + ((now,) if events else ()) + (cnr,),
+            )
+        for event in events:
+            for callback in self._listeners:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Case tracker listener failed: {str(e)}")
+        return events
+
+    def run_due(self, workers=4, limit=100):
+        """Check every due case once; returns all change events"""
+        cnrs = self.due(limit)
+        if not cnrs:
+            return []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='case-check') as pool:
+            results = list(pool.map(self.check, cnrs))
+        events = [event for result in results for event in result]
+        logger.info(f"Checked {len(cnrs)} cases, {len(events)} changes")
+        return events
+
+    def events(self, since_id=0, cnr=None, limit=500):
+        query = 'SELECT * FROM events WHERE id > ?'
+        params = [since_id]
+        if cnr:
+            query += ' AND cnr = ?'
+            params.append(cnr.strip().upper())
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY id LIMIT ?', params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT COUNT(*) AS tracked, SUM(next_check <= ?) AS due, SUM(failures > 0) AS failing FROM cases',
+                (time.time(),),
+            ).fetchone()
+            events = self._conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+        return {'tracked': row['tracked'], 'due': row['due'] or 0, 'failing': row['failing'] or 0, 'events': events}
+
+    def start(self, poll=60, workers=4):
+        """Re-check due cases in a background thread until stop()"""
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.run_due(workers)
+                except Exception as e:
+                    logger.error(f"Case tracker run failed: {str(e)}")
+                self._stop.wait(poll)
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='case-tracker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Track eCourts case status changes')
+    parser.add_argument('--db', default=TRACKER_PATH)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    track_parser = subparsers.add_parser('track', help='Start tracking CNRs')
+    track_parser.add_argument('cnrs', nargs='+')
+    track_parser.add_argument('--interval', type=float, help='Hours between checks')
+    subparsers.add_parser('check', help='Check all due cases once')
+    run_parser = subparsers.add_parser('run', help='Check due cases on a schedule')
+    run_parser.add_argument('--poll', type=float, default=60, help='Seconds between scheduler passes')
+    events_parser = subparsers.add_parser('events', help='Print change events')
+    events_parser.add_argument('--since', type=int, default=0)
+    events_parser.add_argument('--cnr')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    tracker = CaseTracker(args.db)
+    if args.command == 'track':
+        tracker.track(args.cnrs, args.interval * 3600 if args.interval else None)
+        print(f"Tracking {tracker.stats()['tracked']} cases")
+    elif args.command == 'check':
+        for event in tracker.run_due():
+            print(json.dumps(event))
+    elif args.command == 'run':
+        tracker.add_listener(lambda event: print(json.dumps(event), flush=True))
+        tracker.start(poll=args.poll)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            tracker.stop()
+    else:
+        for event in tracker.events(args.since, args.cnr):
+            print(json.dumps(event))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+import csv
+import json
+import logging
+import re
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+FIELDS = (
+    'state', 'district', 'court_complex', 'date',
+    'serial_no', 'case_number', 'petitioner', 'respondent',
+    'court_room', 'judge_name', 'hearing_time',
+)
+
+# Header text (lower-cased) -> field, for eCourts style HTML tables
+HEADER_ALIASES = {
+    'sr no': 'serial_no', 'sr. no.': 'serial_no', 'sl no': 'serial_no', 's.no': 'serial_no',
+    'serial no': 'serial_no', 'serial_no': 'serial_no',
+    'case number': 'case_number', 'case no': 'case_number', 'case no.': 'case_number',
+    'case_number': 'case_number', 'case type/case number/case year': 'case_number',
+    'petitioner': 'petitioner', 'respondent': 'respondent',
+    'party name': 'parties', 'parties': 'parties',
+    'court room': 'court_room', 'court_room': 'court_room', 'court no': 'court_room',
+    'judge': 'judge_name', 'judge name': 'judge_name', 'judge_name': 'judge_name',
+    'time': 'hearing_time', 'hearing time': 'hearing_time', 'hearing_time': 'hearing_time',
+}
+
+# "1. Case No: ABC/123/2024 - Civil Appeal" style lines in text/PDF lists
+CASE_LINE = re.compile(r'^\s*(\d+)[.)]?\s+(?:Case No:?\s*)?([A-Z][\w.-]*/\d+/\d{4})\b(.*)$', re.I)
+TEXT_HEADER = re.compile(r'^\s*(State|District|Court Complex|Date)\s*:\s*(.+)$', re.I)
+TEXT_HEADERS = {'state': 'state', 'district': 'district', 'court complex': 'court_complex', 'date': 'date'}
+VERSUS = re.compile(r'\s+(?:vs\.?|v/s|versus)\s+', re.I)
+
+
+class CauseListEntry:
+    """One hearing in a cause list, flattened with its list metadata"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, state=None, district=None, court_complex=None, date=None,
+                 serial_no=None, case_number=None, petitioner=None, respondent=None,
+                 court_room=None, judge_name=None, hearing_time=None):
+        self.state = state
+        self.district = district
+        self.court_complex = court_complex
+        self.date = date
+        self.serial_no = serial_no
+        self.case_number = case_number
+        self.petitioner = petitioner
+        self.respondent = respondent
+        self.court_room = court_room
+        self.judge_name = judge_name
+        self.hearing_time = hearing_time
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __repr__(self):
+        return f"CauseListEntry({self.case_number!r}, {self.date!r}, serial_no={self.serial_no!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, CauseListEntry):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+
+def _serial(value):
+    try:
+        return int(str(value).strip().rstrip('.'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _split_parties(text):
+    parts = VERSUS.split(text or '', maxsplit=1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    return (text or '').strip() or None, None
+
+
+def parse_json(source, metadata=None):
+    """Yield entries from the downloads/causelist_*.json format.
+
+    `source` is a path or an already-loaded dict.
+    """
+    if isinstance(source, dict):
+        document = source
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+    meta = dict(document.get('metadata') or {})
+    if metadata:
+        meta.update(metadata)
+    for item in document.get('causelist', []):
+        yield CauseListEntry(
+            state=meta.get('state'),
+            district=meta.get('district'),
+            court_complex=meta.get('court_complex'),
+            date=meta.get('date'),
+            serial_no=_serial(item.get('serial_no')),
+            case_number=item.get('case_number'),
+            petitioner=item.get('petitioner'),
+            respondent=item.get('respondent'),
+            court_room=item.get('court_room'),
+            judge_name=item.get('judge_name'),
+            hearing_time=item.get('hearing_time'),
+        )
+
+
+def parse_html(html, metadata=None):
+    """Yield entries from the cause list <table> of an eCourts page"""
+    meta = metadata or {}
+    soup = BeautifulSoup(html, 'html.parser')
+    for table in soup.find_all('table'):
+        rows = table.find_all('tr')
+        if not rows:
+            continue
+        headers = [cell.get_text(' ', strip=True).lower() for cell in rows[0].find_all(['th', 'td'])]
+        columns = [HEADER_ALIASES.get(header) for header in headers]
+        if 'case_number' not in columns:
+            continue
+        for row in rows[1:]:
+            cells = [cell.get_text(' ', strip=True) for cell in row.find_all(['td', 'th'])]
+            if len(cells) < len(columns):
+                continue
+            values = {}
+            for field, text in zip(columns, cells):
+                if field == 'parties':
+                    values['petitioner'], values['respondent'] = _split_parties(text)
+                elif field:
+                    values[field] = text or None
+            if not values.get('case_number'):
+                continue
+            values['serial_no'] = _serial(values.get('serial_no'))
+            yield CauseListEntry(
+                state=meta.get('state'),
+                district=meta.get('district'),
+                court_complex=meta.get('court_complex'),
+                date=meta.get('date'),
+                **values
+            )
+
+
+def parse_text(lines, metadata=None):
+    """Yield entries from numbered "N. Case No: X/1/2024 - ..." text lines.
+
+    Parties are taken from the rest of the line only when it reads
+    "PETITIONER vs RESPONDENT"; otherwise both stay None.
+
+    "State:", "District:", "Court Complex:" and "Date:" header lines fill
+    in metadata that was not passed explicitly.
+    """
+    meta = dict(metadata or {})
+    for line in lines:
+        header = TEXT_HEADER.match(line)
+        if header:
+            meta.setdefault(TEXT_HEADERS[header.group(1).lower()], header.group(2).strip())
+            continue
+        match = CASE_LINE.match(line)
+        if not match:
+            continue
+        serial_no, case_number, rest = match.groups()
+        # Without a "vs" the rest is a case type or remark, not a party
+        petitioner = respondent = None
+        if VERSUS.search(rest):
+            petitioner, respondent = _split_parties(rest.strip(' -:'))
+        yield CauseListEntry(
+            state=meta.get('state'),
+            district=meta.get('district'),
+            court_complex=meta.get('court_complex'),
+            date=meta.get('date'),
+            serial_no=int(serial_no),
+            case_number=case_number,
+            petitioner=petitioner,
+            respondent=respondent,
+        )
+
+
+def parse_pdf(path, metadata=None):
+    """Yield entries from a cause list PDF (needs: pip install pypdf)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("pypdf is required to parse PDF cause lists (pip install pypdf)")
+    reader = PdfReader(path)
+    for page in reader.pages:
+        yield from parse_text((page.extract_text() or '').splitlines(), metadata)
+
+
+def parse_file(path, metadata=None):
+    """Pick a parser from the file extension"""
+    lower = path.lower()
+    if lower.endswith('.json'):
+        return parse_json(path, metadata)
+    if lower.endswith('.pdf'):
+        with open(path, 'rb') as f:
+            is_pdf = f.read(5) == b'%PDF-'
+        # Without reportlab the scraper writes plain text under a .pdf name
+        if is_pdf:
+            return parse_pdf(path, metadata)
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if lower.endswith(('.html', '.htm')):
+        return parse_html(content, metadata)
+    return parse_text(content.splitlines(), metadata)
+
+
+def write_jsonl(entries, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry.as_dict(), ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def write_csv(entries, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for entry in entries:
+            writer.writerow([getattr(entry, field) for field in FIELDS])
+            count += 1
+    return count
+
+
+def write_parquet(entries, path, batch_size=10000):
+    """Write entries in row-group batches (needs: pip install pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required for Parquet output (pip install pyarrow)")
+
+    schema = pa.schema([
+        (field, pa.int32() if field == 'serial_no' else pa.string()) for field in FIELDS
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        columns = {field: [] for field in FIELDS}
+        for entry in entries:
+            for field in FIELDS:
+                columns[field].append(getattr(entry, field))
+            count += 1
+            if count % batch_size == 0:
+                writer.write_table(pa.table(columns, schema=schema))
+                columns = {field: [] for field in FIELDS}
+        if count % batch_size:
+            writer.write_table(pa.table(columns, schema=schema))
+    return count
+
+
+WRITERS = {
+    'jsonl': write_jsonl,
+    'csv': write_csv,
+    'parquet': write_parquet,
+}
+
+
+def write_entries(entries, path, fmt=None):
+    """Stream entries to path; format defaults to the file extension"""
+    fmt = fmt or path.rsplit('.', 1)[-1].lower()
+    if fmt == 'json':
+        fmt = 'jsonl'
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    count = WRITERS[fmt](entries, path)
+    logger.info(f"Wrote {count} cause list entries to {path}")
+    return count
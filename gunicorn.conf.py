@@ -0,0 +1,42 @@
+"""Gunicorn settings for serving the scraper in production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Scrapes spend their time waiting on eCourts, so each worker process runs
+a pool of threads (gthread). The app is preloaded in the master: imports
+and the hierarchy are loaded once and shared copy-on-write by the forked
+workers, which then reopen their own upstream and SQLite connections.
+
+Background jobs and their status live in the worker that accepted them,
+so /api/status polling only works reliably with one worker unless the
+proxy in front keeps each client on the same worker.
+"""
+import os
+
+bind = os.environ.get('ECOURTS_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('ECOURTS_WEB_WORKERS', 1))
+# Matches the upstream connection pool (ECOURTS_POOL_MAXSIZE)
+threads = int(os.environ.get('ECOURTS_WEB_THREADS', 16))
+worker_class = 'gthread'
+preload_app = True
+# Slow upstream pages and PDF renders can legitimately take a while
+timeout = int(os.environ.get('ECOURTS_WEB_TIMEOUT', 120))
+# How long a stopping worker may spend finishing requests and queued downloads
+graceful_timeout = int(os.environ.get('ECOURTS_GRACEFUL_TIMEOUT', 120))
+keepalive = 5
+accesslog = os.environ.get('ECOURTS_ACCESS_LOG') or None
+
+
+def post_fork(server, worker):
+    from app import start_background
+    from scraper import get_scraper
+
+    get_scraper().after_fork()
+    # Workers share one pre-fetch database, so only one of them runs each night
+    start_background()
+
+
+def worker_exit(server, worker):
+    from app import shutdown
+
+    shutdown()
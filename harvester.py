@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+HarvestTask = namedtuple('HarvestTask', ['state', 'district', 'court_complex', 'date'])
+
+
+def date_range(start_date, days):
+    """Yield `days` consecutive DD-MM-YYYY dates starting at start_date"""
+    start = datetime.strptime(start_date, '%d-%m-%Y')
+    for offset in range(days):
+        yield (start + timedelta(days=offset)).strftime('%d-%m-%Y')
+
+
+def expand_selector(scraper, states, districts=None, complexes=None):
+    """Yield (state, district, complex) names matching a hierarchy selector.
+
+    `states` is a list of state names or ['*'] for every state; `districts`
+    and `complexes` restrict the lower levels and default to all of them.
+    """
+    if states == ['*']:
+        states = [state['name'] for state in scraper.get_states()]
+    wanted_districts = set(districts) if districts else None
+    wanted_complexes = set(complexes) if complexes else None
+
+    for state_name in states:
+        for district in scraper.get_districts(state_name):
+            if wanted_districts and district['name'] not in wanted_districts:
+                continue
+            for court_complex in scraper.get_court_complexes(state_name, district['name']):
+                if wanted_complexes and court_complex['name'] not in wanted_complexes:
+                    continue
+                yield state_name, district['name'], court_complex['name']
+
+
+def build_tasks(scraper, states, start_date, days, districts=None, complexes=None):
+    """Cross a hierarchy selector with a date range"""
+    dates = list(date_range(start_date, days))
+    for state_name, district_name, complex_name in expand_selector(scraper, states, districts, complexes):
+        for date_str in dates:
+            yield HarvestTask(state_name, district_name, complex_name, date_str)
+
+
+class CauseListHarvester:
+    """Fan cause-list downloads out over a bounded worker pool.
+
+    At most `workers` downloads run at once, and at most `per_host` of
+    them talk to the same upstream host. Tasks are pulled lazily from the
+    input iterable so very large selections never sit in memory.
+    """
+
+    def __init__(self, scraper, workers=8, per_host=4):
+        self.scraper = scraper
+        self.workers = workers
+        self.per_host = per_host
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _run_one(self, task):
+        started = time.time()
+        with self._host_limit(self.scraper.base_url):
+            try:
+                result = self.scraper.download_cause_list(
+                    task.state, task.district, task.court_complex, task.date
+                )
+            except Exception as e:
+                logger.error(f"Harvest of {task} failed: {str(e)}")
+                result = {'success': False, 'error': str(e)}
+        result = dict(result)
+        result['task'] = task._asdict()
+        result['elapsed'] = round(time.time() - started, 3)
+        return result
+
+    def run(self, tasks, progress=None):
+        """Yield one result dict per task as downloads finish.
+
+        progress(done, failed, rate_per_hour) is called after each result.
+        """
+        tasks = iter(tasks)
+        done = 0
+        failed = 0
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='harvest') as pool:
+            pending = set()
+            exhausted = False
+            while True:
+                # Keep a small window of queued work instead of submitting everything
+                while not exhausted and len(pending) < self.workers * 2:
+                    try:
+                        task = next(tasks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(self._run_one, task))
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    done += 1
+                    if not result.get('success'):
+                        failed += 1
+                    if progress:
+                        elapsed = max(time.time() - started, 1e-6)
+                        progress(done, failed, done / elapsed * 3600)
+                    yield result
@@ -0,0 +1,369 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Seconds before an entry is considered stale, per hierarchy level
+DEFAULT_TTLS = {
+    'states': 7 * 24 * 3600,
+    'districts': 24 * 3600,
+    'complexes': 24 * 3600,
+}
+
+# Stale entries are still served (while refreshing) up to this age
+DEFAULT_MAX_STALE = 30 * 24 * 3600
+
+
+class MemoryLRU:
+    """Small thread-safe LRU map of key -> (value, stored_at)"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._data[key] = (value, stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """On-disk cache backing stored in a single SQLite table"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS hierarchy_cache '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)'
+            )
+
+    def reopen(self):
+        """New connection for a forked child; SQLite handles must not cross fork()"""
+        with self._lock:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, stored_at FROM hierarchy_cache WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, stored_at):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO hierarchy_cache (key, value, stored_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), stored_at)
+            )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM hierarchy_cache WHERE key = ?', (key,))
+
+    def delete_prefix(self, prefix):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM hierarchy_cache WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix)
+            )
+
+
+class JSONBackend:
+    """On-disk cache backing stored as one JSON document"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cache file {path}: {str(e)}")
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+        return entry['value'], entry['stored_at']
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._data[key] = {'value': value, 'stored_at': stored_at}
+            self._flush()
+
+    def delete(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._flush()
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+            self._flush()
+
+    def _flush(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+
+
+def open_backend(path):
+    """Pick a disk backend from the file extension"""
+    if not path:
+        return None
+    if path.endswith('.json'):
+        return JSONBackend(path)
+    return SQLiteBackend(path)
+
+
+class HierarchyCache:
+    """TTL cache for the state/district/complex hierarchy.
+
+    Fresh entries are returned directly. Stale entries are returned
+    immediately while a background thread reloads them, and are kept
+    serving if the reload fails, so an upstream outage does not push
+    callers onto the hard-coded fallback lists.
+    """
+
+    def __init__(self, ttls=None, max_entries=1024, backend=None, max_stale=DEFAULT_MAX_STALE):
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_stale = max_stale
+        self.memory = MemoryLRU(max_entries)
+        self.backend = backend
+        self._refreshing = set()
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(level, key):
+        return f"{level}:{key}"
+
+    def after_fork(self):
+        """Reopen the disk backend in a forked worker; memory entries are kept"""
+        if hasattr(self.backend, 'reopen'):
+            self.backend.reopen()
+
+    def add_listener(self, callback):
+        """Register callback(level, key, value) called after every store"""
+        self._listeners.append(callback)
+
+    def _lookup(self, cache_key):
+        entry = self.memory.get(cache_key)
+        if entry is None and self.backend is not None:
+            try:
+                entry = self.backend.get(cache_key)
+            except Exception as e:
+                logger.error(f"Cache backend read failed: {str(e)}")
+                entry = None
+            if entry is not None:
+                self.memory.set(cache_key, entry[0], entry[1])
+        return entry
+
+    def peek(self, level, key):
+        """Return a cached value regardless of age, or None"""
+        entry = self._lookup(self._key(level, key))
+        return entry[0] if entry is not None else None
+
+    def set(self, level, key, value):
+        """Store a value for a level/key"""
+        cache_key = self._key(level, key)
+        stored_at = time.time()
+        self.memory.set(cache_key, value, stored_at)
+        if self.backend is not None:
+            try:
+                self.backend.set(cache_key, value, stored_at)
+            except Exception as e:
+                logger.error(f"Cache backend write failed: {str(e)}")
+        for callback in self._listeners:
+            try:
+                callback(level, key, value)
+            except Exception as e:
+                logger.error(f"Cache listener failed: {str(e)}")
+
+    def get_or_load(self, level, key, loader):
+        """Return the cached value, loading it with loader() on a miss.
+
+        loader() must return None on failure; failures are never cached.
+        """
+        cache_key = self._key(level, key)
+        entry = self._lookup(cache_key)
+        now = time.time()
+        ttl = self.ttls.get(level, DEFAULT_TTLS['districts'])
+
+        if entry is not None:
+            value, stored_at = entry
+            age = now - stored_at
+            if age < ttl:
+                self.hits += 1
+                CACHE_LOOKUPS.inc(level=level, result='hit')
+                return value
+            if age < ttl + self.max_stale:
+                self.stale_hits += 1
+                CACHE_LOOKUPS.inc(level=level, result='stale')
+                self._refresh_in_background(level, key, loader)
+                return value
+
+        self.misses += 1
+        CACHE_LOOKUPS.inc(level=level, result='miss')
+        value = self._load(level, key, loader)
+        if value is None and entry is not None:
+            # Upstream is down; an old answer beats the fallback lists
+            return entry[0]
+        return value
+
+    async def get_or_load_async(self, level, key, loader):
+        """Coroutine variant of get_or_load for an async loader()"""
+        cache_key = self._key(level, key)
+        entry = self._lookup(cache_key)
+        now = time.time()
+        ttl = self.ttls.get(level, DEFAULT_TTLS['districts'])
+
+        if entry is not None:
+            value, stored_at = entry
+            age = now - stored_at
+            if age < ttl:
+                self.hits += 1
+                CACHE_LOOKUPS.inc(level=level, result='hit')
+                return value
+            if age < ttl + self.max_stale:
+                self.stale_hits += 1
+                CACHE_LOOKUPS.inc(level=level, result='stale')
+                self._refresh_async(level, key, loader)
+                return value
+
+        self.misses += 1
+        CACHE_LOOKUPS.inc(level=level, result='miss')
+        value = await self._load_async(level, key, loader)
+        if value is None and entry is not None:
+            return entry[0]
+        return value
+
+    async def _load_async(self, level, key, loader):
+        try:
+            value = await loader()
+        except Exception as e:
+            logger.error(f"Loading {level}:{key} failed: {str(e)}")
+            value = None
+        if value:
+            self.set(level, key, value)
+            return value
+        return None
+
+    def _refresh_async(self, level, key, loader):
+        cache_key = self._key(level, key)
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        async def refresh():
+            try:
+                await self._load_async(level, key, loader)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        task = asyncio.ensure_future(refresh())
+        # Keep a reference so the refresh is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _load(self, level, key, loader):
+        try:
+            value = loader()
+        except Exception as e:
+            logger.error(f"Loading {level}:{key} failed: {str(e)}")
+            value = None
+        if value:
+            self.set(level, key, value)
+            return value
+        return None
+
+    def _refresh_in_background(self, level, key, loader):
+        cache_key = self._key(level, key)
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def refresh():
+            try:
+                self._load(level, key, loader)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=refresh, name=f"refresh-{cache_key}", daemon=True).start()
+
+    def invalidate(self, level=None, key=None):
+        """Drop cached entries for a level/key, a whole level, or everything"""
+        targets = [self.memory] + ([self.backend] if self.backend is not None else [])
+        for target in targets:
+            try:
+                if key is not None:
+                    target.delete(self._key(level, key))
+                else:
+                    target.delete_prefix(f"{level}:" if level else '')
+            except Exception as e:
+                logger.error(f"Cache invalidate failed: {str(e)}")
+
+    def stats(self):
+        """Hit/miss counters"""
+        return {
+            'entries': len(self.memory),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+        }
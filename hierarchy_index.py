@@ -0,0 +1,96 @@
+import threading
+
+
+def normalize_name(name):
+    """Case/whitespace-insensitive form of a state/district/complex name"""
+    return ' '.join(str(name).split()).casefold()
+
+
+class HierarchyIndex:
+    """O(1) name <-> code lookups for the state/district/complex hierarchy.
+
+    Rebuilt per level whenever that level is refreshed, so lookups never
+    need to re-fetch the parent list just to map a name to a code.
+    Children are stored as parent code -> list of {'name', 'value'} items.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state_codes = {}
+        self._state_names = {}
+        # Parent key -> {normalized name: code} and {code: name}, so a
+        # reload swaps one parent's children out in a single assignment
+        self._district_codes = {}
+        self._district_names = {}
+        self._complex_codes = {}
+        self._complex_names = {}
+        self._children = {}
+
+    def has_states(self):
+        return bool(self._state_codes)
+
+    def has_districts(self, state_code):
+        return ('districts', state_code) in self._children
+
+    def has_complexes(self, state_code, district_code):
+        return ('complexes', state_code, district_code) in self._children
+
+    @staticmethod
+    def _maps(items):
+        codes = {}
+        names = {}
+        for item in items:
+            codes[normalize_name(item['name'])] = item['value']
+            names[item['value']] = item['name']
+        return codes, names
+
+    def load_states(self, states):
+        """Replace the indexed state list"""
+        codes, names = self._maps(states)
+        with self._lock:
+            self._state_codes = codes
+            self._state_names = names
+            self._children[('states',)] = list(states)
+
+    def load_districts(self, state_code, districts):
+        """Replace the indexed districts of one state"""
+        codes, names = self._maps(districts)
+        with self._lock:
+            self._district_codes[state_code] = codes
+            self._district_names[state_code] = names
+            self._children[('districts', state_code)] = list(districts)
+
+    def load_complexes(self, state_code, district_code, complexes):
+        """Replace the indexed court complexes of one district"""
+        codes, names = self._maps(complexes)
+        with self._lock:
+            self._complex_codes[(state_code, district_code)] = codes
+            self._complex_names[(state_code, district_code)] = names
+            self._children[('complexes', state_code, district_code)] = list(complexes)
+
+    def state_code(self, name):
+        return self._state_codes.get(normalize_name(name))
+
+    def state_name(self, code):
+        return self._state_names.get(code)
+
+    def district_code(self, state_code, name):
+        return self._district_codes.get(state_code, {}).get(normalize_name(name))
+
+    def district_name(self, state_code, code):
+        return self._district_names.get(state_code, {}).get(code)
+
+    def complex_code(self, state_code, district_code, name):
+        return self._complex_codes.get((state_code, district_code), {}).get(normalize_name(name))
+
+    def complex_name(self, state_code, district_code, code):
+        return self._complex_names.get((state_code, district_code), {}).get(code)
+
+    def states(self):
+        return self._children.get(('states',), [])
+
+    def districts(self, state_code):
+        return self._children.get(('districts', state_code), [])
+
+    def complexes(self, state_code, district_code):
+        return self._children.get(('complexes', state_code, district_code), [])
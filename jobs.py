@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get('ECOURTS_JOB_WORKERS', 4))
+
+# Finished jobs are forgotten after this many seconds
+JOB_RETENTION = 3600
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+
+
+class JobQueue:
+    """Run callables on a worker pool and track their status by job id"""
+
+    def __init__(self, workers=JOB_WORKERS, retention=JOB_RETENTION):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, message='Queued', **kwargs):
+        """Enqueue func(*args, **kwargs) and return the new job id"""
+        self._expire()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': QUEUED,
+                'progress': 0,
+                'message': message,
+                'data': None,
+                'created_at': time.time(),
+                'finished_at': None,
+            }
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _run(self, job_id, func, args, kwargs):
+        self._update(job_id, status=RUNNING, progress=10, message='Fetching cause list...')
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self._update(job_id, status=ERROR, message=str(e), finished_at=time.time())
+            return
+        if isinstance(result, dict) and result.get('success') is False:
+            self._update(job_id, status=ERROR, progress=100, data=result,
+                         message=result.get('error', 'Job failed'), finished_at=time.time())
+        else:
+            message = result.get('message', 'Completed') if isinstance(result, dict) else 'Completed'
+            self._update(job_id, status=DONE, progress=100, data=result,
+                         message=message, finished_at=time.time())
+
+    def get(self, job_id):
+        """Snapshot of a job, or None if unknown/expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def counts(self):
+        """Number of jobs per status"""
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, ERROR: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+        return counts
+
+    def _expire(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job['finished_at'] and job['finished_at'] < cutoff]:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs; optionally wait for running ones to finish"""
+        self._executor.shutdown(wait=wait)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide job queue used by the Flask routes"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue()
+    return _job_queue
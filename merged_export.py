@@ -0,0 +1,189 @@
+import heapq
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from causelist_parser import parse_file
+from harvester import date_range
+from hierarchy_index import normalize_name
+from search_index import date_key
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds for one export request
+MAX_EXPORT_DAYS = int(os.environ.get('ECOURTS_EXPORT_MAX_DAYS', 31))
+MAX_EXPORT_COMPLEXES = int(os.environ.get('ECOURTS_EXPORT_MAX_COMPLEXES', 20))
+EXPORT_FORMATS = ('pdf', 'json')
+# Exports are one-off downloads outside the artifact store; drop them after this long
+EXPORT_MAX_AGE = float(os.environ.get('ECOURTS_EXPORT_MAX_AGE_HOURS', 24)) * 3600
+EXPORT_PREFIX = 'export_'
+
+
+def sort_key(entry):
+    """Date, then complex, then list order"""
+    return (
+        date_key(entry.date) or '',
+        normalize_name(entry.court_complex or ''),
+        entry.serial_no if entry.serial_no is not None else float('inf'),
+        entry.case_number or '',
+    )
+
+
+def _identity(entry):
+    return (normalize_name(entry.court_complex or ''), (entry.case_number or '').upper())
+
+
+def merge_day(lists):
+    """Merge one day's already-sorted lists, dropping repeated cases"""
+    seen = set()
+    for entry in heapq.merge(*lists, key=sort_key):
+        identity = _identity(entry)
+        if identity in seen:
+            continue
+        seen.add(identity)
+        yield entry
+
+
+def evict_exports(directory='downloads', max_age=EXPORT_MAX_AGE):
+    """Remove export files (and leftover temp files) older than max_age; returns how many"""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        if not name.startswith(EXPORT_PREFIX):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"Evicted {removed} old exports")
+    return removed
+
+
+class MergedExport:
+    """One consolidated cause list over many complexes and days.
+
+    Days are processed in order and only one day's lists are held at a
+    time: each list is fetched through download_cause_list (so stored
+    copies are reused), parsed, sorted, then k-way merged with
+    heapq.merge and deduplicated. Output is streamed to JSON, or spooled
+    to a text file that the PDF renderer reads page by page. Exports
+    older than EXPORT_MAX_AGE are removed when the next one is written.
+    """
+
+    def __init__(self, scraper, workers=4):
+        self.scraper = scraper
+        self.workers = workers
+
+    def _load(self, state, district, court_complex, date_str):
+        result = self.scraper.download_cause_list(state, district, court_complex, date_str)
+        path = self.scraper.result_path(result) if result.get('success') else None
+        if path is None:
+            logger.warning(f"No cause list for {court_complex} on {date_str}: {result.get('error')}")
+            return []
+        metadata = {'state': state, 'district': district, 'court_complex': court_complex, 'date': date_str}
+        return sorted(parse_file(path, metadata), key=sort_key)
+
+    def entries(self, state, complexes, start_date, days):
+        """Yield merged entries; complexes is a list of (district, complex) pairs"""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export') as pool:
+            for date_str in date_range(start_date, days):
+                lists = pool.map(
+                    lambda pair: self._load(state, pair[0], pair[1], date_str), complexes
+                )
+                yield from merge_day(list(lists))
+
+    def write_json(self, entries, path):
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for entry in entries:
+                f.write(',\n' if count else '\n')
+                f.write(json.dumps(entry.as_dict(), ensure_ascii=False))
+                count += 1
+            f.write('\n]\n')
+        return count
+
+    def write_pdf(self, entries, path, title):
+        lines_path = f"{path}.lines"
+        current = None
+        count = 0
+        try:
+            with open(lines_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    count += 1
+                    group = (entry.date, entry.court_complex)
+                    if group != current:
+                        if current is not None:
+                            f.write('\n')
+                        f.write(f"{entry.date} - {entry.court_complex}\n")
+                        current = group
+                    parties = ' vs '.join(part for part in (entry.petitioner, entry.respondent) if part)
+                    line = f"{entry.serial_no or '-'}. Case No: {entry.case_number}"
+                    if parties:
+                        line += f" - {parties}"
+                    if entry.court_room:
+                        line += f" (Court {entry.court_room})"
+                    f.write(' '.join(line.splitlines()) + '\n')
+            self.scraper.renderer.render({
+                'path': path,
+                'title': title,
+                'meta': [],
+                'lines_path': lines_path,
+                'footer': [f"{count} hearings"],
+            })
+        finally:
+            if os.path.exists(lines_path):
+                os.remove(lines_path)
+        return count
+
+    def export(self, state, complexes, start_date, days, fmt='pdf'):
+        """Write the merged list into downloads/; returns a download result dict"""
+        # The same complex picked twice is fetched once
+        complexes = list(dict.fromkeys(
+            (district, court_complex) for district, court_complex in complexes
+        ))
+        if fmt not in EXPORT_FORMATS:
+            return {'success': False, 'error': f'Unsupported export format: {fmt}'}
+        if not complexes:
+            return {'success': False, 'error': 'No court complexes selected'}
+        if days > MAX_EXPORT_DAYS or len(complexes) > MAX_EXPORT_COMPLEXES:
+            return {'success': False, 'error': f'Export is limited to {MAX_EXPORT_DAYS} days '
+                                              f'and {MAX_EXPORT_COMPLEXES} court complexes'}
+
+        evict_exports()
+        filename = f"{EXPORT_PREFIX}{state}_{start_date.replace('-', '_')}_{days}d_{uuid.uuid4().hex[:8]}.{fmt}"
+        filepath = os.path.join('downloads', filename)
+        tmp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        try:
+            entries = self.entries(state, complexes, start_date, days)
+            if fmt == 'json':
+                count = self.write_json(entries, tmp_path)
+            else:
+                title = f"Cause Lists: {state}, {start_date} (+{days - 1} days)" if days > 1 else \
+                    f"Cause Lists: {state}, {start_date}"
+                count = self.write_pdf(entries, tmp_path, title)
+            os.replace(tmp_path, filepath)
+        except Exception as e:
+            logger.error(f"Export failed: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return {'success': False, 'error': f'Export failed: {str(e)}'}
+
+        return {
+            'success': True,
+            'filename': filename,
+            'entries': count,
+            'message': f'Exported {count} hearings from {len(complexes)} court complexes over {days} days',
+            'download_url': f'/download/{filename}',
+        }
@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+TRACE_ALL = os.environ.get('ECOURTS_TRACE', '').lower() in ('1', 'true', 'yes')
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def count(self, **labels):
+        series = self._series.get(_label_key(labels))
+        return series[1] if series else 0
+
+    def sum(self, **labels):
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0.0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, value_sum) in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, {'le': bound})} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {total}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {total}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {value_sum}")
+        return lines
+
+
+class Registry:
+    """Metric registry plus pluggable per-stage hooks and request traces"""
+
+    def __init__(self):
+        self._metrics = []
+        self._hooks = []
+        self._local = threading.local()
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text):
+        return self.register(Counter(name, help_text))
+
+    def gauge(self, name, help_text):
+        return self.register(Gauge(name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, buckets))
+
+    def add_hook(self, callback):
+        """Register callback(stage, seconds, labels) called after every timed stage"""
+        self._hooks.append(callback)
+
+    def remove_hook(self, callback):
+        self._hooks.remove(callback)
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """Time a block as one stage of the hot path"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            STAGE_SECONDS.observe(elapsed, stage=name, **labels)
+            trace = getattr(self._local, 'trace', None)
+            if trace is not None:
+                trace.append((name, labels, elapsed))
+            for callback in self._hooks:
+                try:
+                    callback(name, elapsed, labels)
+                except Exception as e:
+                    logger.error(f"Metrics hook failed: {str(e)}")
+
+    def start_trace(self):
+        """Begin collecting stages for the current thread"""
+        self._local.trace = []
+
+    def finish_trace(self):
+        """Stop collecting and return [(stage, labels, seconds), ...]"""
+        trace = getattr(self._local, 'trace', None)
+        self._local.trace = None
+        return trace or []
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram('ecourts_stage_seconds', 'Time spent per scraper stage')
+RESPONSE_BYTES = registry.histogram('ecourts_response_bytes', 'Upstream response body size', BYTES_BUCKETS)
+UPSTREAM_RESPONSES = registry.counter('ecourts_upstream_responses_total', 'Upstream responses by endpoint and status')
+CACHE_LOOKUPS = registry.counter('ecourts_cache_lookups_total', 'Hierarchy cache lookups by level and result')
+LOOKUPS = registry.counter('ecourts_lookups_total', 'Hierarchy lookups served, by level')
+FALLBACKS = registry.counter('ecourts_fallback_total', 'Lookups answered from hard-coded fallback data')
+WAIT_SAVED = registry.counter('ecourts_browser_wait_saved_seconds_total', 'Seconds saved versus the old fixed sleeps, by step')
+WAIT_LOST = registry.counter('ecourts_browser_wait_lost_seconds_total', 'Seconds waited beyond the old fixed sleeps, by step')
+STATE_GAUGE = registry.gauge('ecourts_state', 'Point-in-time service state (pool, jobs, store)')
+
+stage = registry.stage
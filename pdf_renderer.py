@@ -0,0 +1,284 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.environ.get('ECOURTS_RENDER_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Layout (points)
+MARGIN_LEFT = 72
+MARGIN_TOP = 72
+MARGIN_BOTTOM = 60
+TITLE_SIZE = 16
+META_SIZE = 12
+BODY_SIZE = 10
+LINE_HEIGHT = 16
+INDENT = 20
+
+_template = None
+
+
+class PageTemplate:
+    """Fonts, metrics and measurements shared by every document a worker renders"""
+
+    def __init__(self):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.utils import simpleSplit
+        from reportlab.pdfbase import pdfmetrics
+
+        self.pagesize = letter
+        self.width, self.height = letter
+        self.split = simpleSplit
+        # Resolve the standard fonts once instead of per document
+        for name in ('Helvetica', 'Helvetica-Bold'):
+            pdfmetrics.getFont(name)
+        self.text_width = self.width - 2 * MARGIN_LEFT - INDENT
+        self.body_top = self.height - MARGIN_TOP - 24
+
+    def wrap(self, line):
+        return self.split(line, 'Helvetica', BODY_SIZE, self.text_width) or ['']
+
+    def _capacities(self, meta):
+        first_top = self.body_top - LINE_HEIGHT * (len(meta) + 2)
+        first_capacity = max(1, int((first_top - MARGIN_BOTTOM) / LINE_HEIGHT))
+        capacity = max(1, int((self.body_top - MARGIN_BOTTOM) / LINE_HEIGHT))
+        return first_capacity, capacity
+
+    def _wrapped(self, heading, lines):
+        if heading:
+            yield heading, False
+        for line in lines:
+            pieces = self.wrap(line)
+            yield pieces[0], True
+            for piece in pieces[1:]:
+                yield piece, 'continued'
+
+    def paginate(self, meta, heading, lines):
+        """Yield body lines page by page; the first page also carries the metadata block"""
+        size, capacity = self._capacities(meta)
+        page = []
+        for item in self._wrapped(heading, lines):
+            if len(page) == size:
+                yield page
+                page, size = [], capacity
+            page.append(item)
+        yield page
+
+    def count_pages(self, meta, heading, lines):
+        """Number of pages paginate() yields, without keeping them"""
+        first_capacity, capacity = self._capacities(meta)
+        rows = sum(1 for _ in self._wrapped(heading, lines))
+        return 1 + max(0, -(-(rows - first_capacity) // capacity))
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        _template = PageTemplate()
+    return _template
+
+
+def _job_lines(job):
+    """Body lines of a job: its 'lines' list, or read one by one from 'lines_path'"""
+    if job.get('lines_path'):
+        with open(job['lines_path'], 'r', encoding='utf-8') as f:
+            for line in f:
+                yield line.rstrip('\n')
+    else:
+        yield from job.get('lines', [])
+
+
+def _render_pdf(job, template):
+    from reportlab.pdfgen import canvas
+
+    meta = job.get('meta', [])
+    heading = job.get('heading')
+    if job.get('lines_path'):
+        # Spooled bodies can be long: count the pages in one pass, draw them in another
+        total = template.count_pages(meta, heading, _job_lines(job))
+        pages = template.paginate(meta, heading, _job_lines(job))
+    else:
+        pages = list(template.paginate(meta, heading, job.get('lines', [])))
+        total = len(pages)
+    footer = job.get('footer', [])
+    # invariant=1 drops timestamps so identical lists hash identically
+    c = canvas.Canvas(job['path'], pagesize=template.pagesize, invariant=1)
+
+    # Page furniture drawn once per document and stamped on every page
+    c.beginForm('furniture')
+    c.setLineWidth(0.5)
+    c.line(MARGIN_LEFT, template.height - MARGIN_TOP + 8, template.width - MARGIN_LEFT, template.height - MARGIN_TOP + 8)
+    c.line(MARGIN_LEFT, MARGIN_BOTTOM - 12, template.width - MARGIN_LEFT, MARGIN_BOTTOM - 12)
+    c.endForm()
+
+    for number, page_lines in enumerate(pages, start=1):
+        c.doForm('furniture')
+        c.setFont('Helvetica-Bold', TITLE_SIZE)
+        c.drawString(MARGIN_LEFT, template.height - MARGIN_TOP - 16, job.get('title', ''))
+        c.setFont('Helvetica', 8)
+        c.drawRightString(template.width - MARGIN_LEFT, MARGIN_BOTTOM - 24, f"Page {number} of {total}")
+
+        y = template.body_top
+        if number == 1:
+            c.setFont('Helvetica', META_SIZE)
+            for label, value in meta:
+                y -= LINE_HEIGHT
+                c.drawString(MARGIN_LEFT, y, f"{label}: {value}")
+            y -= LINE_HEIGHT
+        c.setFont('Helvetica', BODY_SIZE)
+        for text, indented in page_lines:
+            y -= LINE_HEIGHT
+            x = MARGIN_LEFT + (INDENT * 2 if indented == 'continued' else INDENT if indented else 0)
+            c.drawString(x, y, text)
+        if number == total:
+            for text in footer:
+                y -= LINE_HEIGHT * 1.5
+                if y < MARGIN_BOTTOM:
+                    break
+                c.drawString(MARGIN_LEFT, y, text)
+        c.showPage()
+    c.save()
+    return total
+
+
+def _render_text(job):
+    # Fallback: create a text file if reportlab not available
+    with open(job['path'], 'w', encoding='utf-8') as f:
+        f.write(f"{job.get('title', '')}\n")
+        f.write("=" * len(job.get('title', '')) + "\n\n")
+        for label, value in job.get('meta', []):
+            f.write(f"{label}: {value}\n")
+        f.write("\n")
+        if job.get('heading'):
+            f.write(f"{job['heading']}\n")
+        for line in _job_lines(job):
+            f.write(f"{line}\n")
+        for line in job.get('footer', []):
+            f.write(f"{line}\n")
+    return 1
+
+
+def render_document(job):
+    """Render one job dict to job['path']; returns (path, pages, seconds).
+
+    A job has 'path', 'title', 'meta' [(label, value)], optional 'heading',
+    'lines' (body, wrapped and paginated as needed) and 'footer'. Long
+    bodies can instead be spooled to a UTF-8 file, one line per line, and
+    passed as 'lines_path'; they are then read page by page.
+    """
+    started = time.perf_counter()
+    try:
+        template = _get_template()
+    except ImportError:
+        logger.warning("reportlab not installed, creating text file instead")
+        pages = _render_text(job)
+    else:
+        pages = _render_pdf(job, template)
+    return job['path'], pages, time.perf_counter() - started
+
+
+class PdfRenderer:
+    """Renders cause list documents in a process pool.
+
+    Rendering is CPU-bound and holds the GIL, so it runs in worker
+    processes that keep their page template and fonts between documents;
+    request threads only wait on a future. With workers=0 documents are
+    rendered in the calling process.
+    """
+
+    def __init__(self, workers=RENDER_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._documents = 0
+        self._pages = 0
+        self._seconds = 0.0
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking a process that already runs threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def _record(self, pages, seconds):
+        with self._lock:
+            self._documents += 1
+            self._pages += pages
+            self._seconds += seconds
+
+    def render(self, job):
+        """Render one document (blocks until done); returns the page count"""
+        if not self.workers:
+            _, pages, seconds = render_document(job)
+        else:
+            try:
+                _, pages, seconds = self._pool().submit(render_document, job).result()
+            except BrokenProcessPool as e:
+                # A crashed worker breaks the whole pool: start a fresh one next time
+                logger.error(f"Render pool broke ({str(e)}), rendering in-process")
+                self._reset()
+                _, pages, seconds = render_document(job)
+        self._record(pages, seconds)
+        return pages
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def render_many(self, jobs):
+        """Render a batch across the pool; yields (path, pages) in job order"""
+        started = time.perf_counter()
+        total = 0
+        if not self.workers:
+            results = (render_document(job) for job in jobs)
+        else:
+            results = self._pool().map(render_document, jobs, chunksize=4)
+        for path, pages, seconds in results:
+            self._record(pages, seconds)
+            total += pages
+            yield path, pages
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0.0
+        logger.info(f"Rendered {total} pages in {elapsed:.2f}s ({rate:.1f} pages/s)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'documents': self._documents,
+                'pages': self._pages,
+                'render_seconds': round(self._seconds, 3),
+                # Per worker-second; multiply by workers for pool throughput
+                'pages_per_second': round(self._pages / self._seconds, 1) if self._seconds else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer():
+    """Process-wide renderer shared by the scraper and bulk jobs"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = PdfRenderer()
+    return _renderer
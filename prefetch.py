@@ -0,0 +1,291 @@
+"""Pre-fetch tomorrow's cause lists for the most requested court complexes.
+
+    python prefetch.py top [-n 20]
+    python prefetch.py run [--date 11-10-2025] [--budget 50]
+    python prefetch.py schedule
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from hierarchy_index import normalize_name
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# The demand log records what users asked for: keep it out of the served downloads/
+PREFETCH_PATH = os.environ.get('ECOURTS_PREFETCH_DB', os.path.join('data', 'prefetch.sqlite'))
+PREFETCH_ENABLED = os.environ.get('ECOURTS_PREFETCH', '1').lower() in ('1', 'true', 'yes')
+# How many complexes to pre-fetch, ranked by requests over the last WINDOW_DAYS
+PREFETCH_TOP_N = int(os.environ.get('ECOURTS_PREFETCH_TOP_N', 20))
+WINDOW_DAYS = int(os.environ.get('ECOURTS_PREFETCH_WINDOW_DAYS', 14))
+# Upstream downloads allowed per run, and the pause between them
+PREFETCH_BUDGET = int(os.environ.get('ECOURTS_PREFETCH_BUDGET', 50))
+PREFETCH_INTERVAL = float(os.environ.get('ECOURTS_PREFETCH_INTERVAL', 5))
+# Off-peak hours (local time) as START-END; wraps past midnight when START > END
+OFF_PEAK = os.environ.get('ECOURTS_PREFETCH_HOURS', '20-6')
+# Give up on a run after this many failed downloads in a row
+MAX_CONSECUTIVE_FAILURES = 3
+# A claimed run that has not finished after this long is taken over (its process died)
+CLAIM_TIMEOUT = float(os.environ.get('ECOURTS_PREFETCH_CLAIM_TIMEOUT', 3600))
+
+PREFETCHES = registry.counter('ecourts_prefetch_total', 'Pre-fetch attempts by result')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS demand (
+    key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    state TEXT NOT NULL,
+    district TEXT NOT NULL,
+    court_complex TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (key, day)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    date TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    fetched INTEGER NOT NULL DEFAULT 0,
+    stored INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+'''
+
+
+def parse_hours(text):
+    """'20-6' -> (20, 6)"""
+    start, _, end = text.partition('-')
+    return int(start) % 24, int(end or start) % 24
+
+
+def in_off_peak(now, hours=OFF_PEAK):
+    start, end = parse_hours(hours)
+    if start <= end:
+        return start <= now.hour < end
+    return now.hour >= start or now.hour < end
+
+
+def target_date(now):
+    """DD-MM-YYYY of the coming morning: tomorrow in the evening, today after midnight"""
+    day = now + timedelta(days=1) if now.hour >= 12 else now
+    return day.strftime('%d-%m-%Y')
+
+
+class Prefetcher:
+    """Learns which complexes are popular and fetches their next list off-peak.
+
+    Every /api/download-causelist request adds a hit for its complex to a
+    per-day demand table. During off-peak hours the top-N complexes of the
+    last WINDOW_DAYS get the coming morning's list downloaded into the
+    artifact store, so the morning requests are served from disk. Lists
+    already stored cost nothing; new downloads are limited to `budget` per
+    run and spaced `interval` seconds apart to stay well inside the
+    upstream rate limits. Each date is claimed in the database, so several
+    server processes sharing the file run it only once; a date counts as
+    done only when its run finished, and a claim left unfinished for
+    CLAIM_TIMEOUT (a process that died mid-run) is taken over.
+    """
+
+    def __init__(self, scraper, path=PREFETCH_PATH, top_n=PREFETCH_TOP_N, budget=PREFETCH_BUDGET,
+                 interval=PREFETCH_INTERVAL, hours=OFF_PEAK, window_days=WINDOW_DAYS):
+        self.scraper = scraper
+        self.top_n = top_n
+        self.budget = budget
+        self.interval = interval
+        self.hours = hours
+        self.window_days = window_days
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    def record(self, state, district, court_complex):
+        """Count one request for a complex"""
+        key = '|'.join(normalize_name(name) for name in (state, district, court_complex))
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO demand (key, day, state, district, court_complex, hits) VALUES (?, ?, ?, ?, ?, 1) '
+                'ON CONFLICT (key, day) DO UPDATE SET hits = hits + 1',
+                (key, time.strftime('%Y-%m-%d'), state, district, court_complex),
+            )
+
+    def top(self, n=None):
+        """Most requested complexes over the window, as dicts with their hit counts"""
+        since = (datetime.now() - timedelta(days=self.window_days)).strftime('%Y-%m-%d')
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT state, district, court_complex, SUM(hits) AS hits FROM demand '
+                'WHERE day >= ? GROUP BY key ORDER BY hits DESC LIMIT ?',
+                (since, n or self.top_n),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _claim(self, date_str):
+        """Take date_str unless it is finished or another process is still running it"""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO runs (date, started_at) VALUES (?, ?)', (date_str, now)
+            )
+            if cursor.rowcount == 1:
+                return True
+            cursor = self._conn.execute(
+                'UPDATE runs SET started_at = ? WHERE date = ? AND finished_at IS NULL AND started_at < ?',
+                (now, date_str, now - CLAIM_TIMEOUT),
+            )
+        return cursor.rowcount == 1
+
+    def _release(self, date_str):
+        """Give up an unfinished claim so the next off-peak poll runs the date again"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM runs WHERE date = ? AND finished_at IS NULL', (date_str,))
+
+    def _prune(self):
+        cutoff = (datetime.now() - timedelta(days=self.window_days)).strftime('%Y-%m-%d')
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM demand WHERE day < ?', (cutoff,))
+
+    def run(self, date_str=None, force=False):
+        """Pre-fetch date_str (default: the coming morning) once; returns a summary or None if already run"""
+        date_str = date_str or target_date(datetime.now())
+        if not self._claim(date_str) and not force:
+            return None
+        self._prune()
+        summary = {'date': date_str, 'fetched': 0, 'stored': 0, 'failed': 0}
+        failures = 0
+        for item in self.top():
+            # Failed attempts reached upstream too, so they spend budget as well
+            if self._stop.is_set() or summary['fetched'] + summary['failed'] >= self.budget:
+                break
+            if failures >= MAX_CONSECUTIVE_FAILURES:
+                logger.warning(f"Stopping pre-fetch for {date_str} after {failures} failures in a row")
+                break
+            state, district, court_complex = item['state'], item['district'], item['court_complex']
+            store = self.scraper.store
+            if store is not None and store.lookup(state, district, court_complex, date_str) is not None:
+                summary['stored'] += 1
+                PREFETCHES.inc(result='stored')
+                continue
+            try:
+                result = self.scraper.download_cause_list(state, district, court_complex, date_str)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            if result.get('success'):
+                summary['fetched'] += 1
+                failures = 0
+                PREFETCHES.inc(result='fetched')
+            else:
+                summary['failed'] += 1
+                failures += 1
+                PREFETCHES.inc(result='failed')
+                logger.warning(f"Pre-fetch of {court_complex} for {date_str} failed: {result.get('error')}")
+            # Keep well under the upstream rate limit; stop() cuts the pause short
+            self._stop.wait(self.interval)
+        if self._stop.is_set():
+            self._release(date_str)
+            logger.info(f"Pre-fetch for {date_str} stopped after {summary['fetched']} downloads")
+            return summary
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE runs SET finished_at = ?, fetched = ?, stored = ?, failed = ? WHERE date = ?',
+                (time.time(), summary['fetched'], summary['stored'], summary['failed'], date_str),
+            )
+        logger.info(f"Pre-fetched {summary['fetched']} cause lists for {date_str} "
+                    f"({summary['stored']} already stored, {summary['failed']} failed)")
+        return summary
+
+    def runs(self, limit=10):
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM runs ORDER BY started_at DESC LIMIT ?', (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            complexes = self._conn.execute('SELECT COUNT(DISTINCT key) FROM demand').fetchone()[0]
+        last = self.runs(1)
+        return {'complexes': complexes, 'top_n': self.top_n, 'budget': self.budget,
+                'off_peak': self.hours, 'last_run': last[0] if last else None}
+
+    def start(self, poll=300):
+        """Run once per night during off-peak hours, in a background thread until stop()"""
+        def loop():
+            while not self._stop.is_set():
+                now = datetime.now()
+                if in_off_peak(now, self.hours):
+                    try:
+                        self.run()
+                    except Exception as e:
+                        logger.error(f"Pre-fetch run failed: {str(e)}")
+                self._stop.wait(poll)
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='prefetch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    """Process-wide prefetcher over the shared scraper"""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                from scraper import get_scraper
+                _prefetcher = Prefetcher(get_scraper())
+    return _prefetcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-fetch cause lists for popular court complexes')
+    parser.add_argument('--db', default=PREFETCH_PATH)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    top_parser = subparsers.add_parser('top', help='Show the most requested complexes')
+    top_parser.add_argument('-n', type=int, default=PREFETCH_TOP_N)
+    run_parser = subparsers.add_parser('run', help='Pre-fetch one date now (for cron)')
+    run_parser.add_argument('--date', help='DD-MM-YYYY (default: the coming morning)')
+    run_parser.add_argument('--budget', type=int, default=PREFETCH_BUDGET)
+    run_parser.add_argument('--force', action='store_true', help='Run even if the date was already done')
+    subparsers.add_parser('schedule', help='Pre-fetch every night during off-peak hours')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    from scraper import get_scraper
+    prefetcher = Prefetcher(get_scraper(), args.db)
+    if args.command == 'top':
+        for item in prefetcher.top(args.n):
+            print(json.dumps(item))
+    elif args.command == 'run':
+        prefetcher.budget = args.budget
+        summary = prefetcher.run(args.date, force=args.force)
+        print(json.dumps(summary) if summary else 'Already pre-fetched; use --force to run again')
+    else:
+        prefetcher.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            prefetcher.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Requests/second per host; adjusted between MIN and MAX at runtime
+RATE_INITIAL = float(os.environ.get('ECOURTS_RATE_INITIAL', 5))
+RATE_MIN = float(os.environ.get('ECOURTS_RATE_MIN', 0.2))
+RATE_MAX = float(os.environ.get('ECOURTS_RATE_MAX', 20))
+
+# Responses slower than this count as a congestion signal
+SLOW_RESPONSE_SECONDS = 10
+
+THROTTLE_STATUSES = (429, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited by an open breaker"""
+
+
+def host_key(url):
+    return urlparse(url).netloc
+
+
+def endpoint_key(url):
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{parsed.path}"
+
+
+class _Bucket:
+    __slots__ = ('rate', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+
+class AdaptiveRateLimiter:
+    """Token bucket per key whose rate follows AIMD.
+
+    Every healthy response adds `increase` requests/second; a throttling
+    status (429/5xx) or a slow response halves the rate. Retry-After
+    headers pause the bucket for the advertised time.
+    """
+
+    def __init__(self, initial_rate=RATE_INITIAL, min_rate=RATE_MIN, max_rate=RATE_MAX,
+                 burst=None, increase=0.1, decrease=0.5, slow_seconds=SLOW_RESPONSE_SECONDS):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.initial_rate)
+        return bucket
+
+    def reserve(self, key):
+        """Take a token for key and return how long to wait before using it"""
+        with self._lock:
+            bucket = self._bucket(key)
+            now = time.monotonic()
+            capacity = self.burst or max(1.0, bucket.rate)
+            bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            bucket.tokens -= 1
+            wait = 0.0 if bucket.tokens >= 0 else -bucket.tokens / bucket.rate
+            return max(wait, bucket.paused_until - now)
+
+    def acquire(self, key):
+        """Block until a request for key may be sent"""
+        wait = self.reserve(key)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, key, status=None, latency=0.0, retry_after=None):
+        """Feed back the outcome of a request (status None = transport error)"""
+        with self._lock:
+            bucket = self._bucket(key)
+            congested = status is None or status in THROTTLE_STATUSES or latency > self.slow_seconds
+            if congested:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                logger.warning(f"Throttling {key} to {bucket.rate:.2f} req/s (status={status}, latency={latency:.1f}s)")
+            else:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+            if retry_after:
+                bucket.paused_until = max(bucket.paused_until, time.monotonic() + retry_after)
+
+    def stats(self):
+        with self._lock:
+            return {key: round(bucket.rate, 3) for key, bucket in self._buckets.items()}
+
+
+class CircuitBreaker:
+    """Per-endpoint breaker: open after repeated failures, retry after a cooldown"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, cooldown=300):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def before(self, key):
+        """Raise CircuitOpenError if key is open; let one trial call through after the cooldown"""
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or state['state'] == self.CLOSED:
+                return
+            if state['state'] == self.OPEN and time.monotonic() - state['opened_at'] >= self.cooldown:
+                state['state'] = self.HALF_OPEN
+                return
+            raise CircuitOpenError(f"Circuit open for {key}")
+
+    def record(self, key, success):
+        with self._lock:
+            state = self._state.setdefault(key, {'state': self.CLOSED, 'failures': 0, 'opened_at': 0.0})
+            if success:
+                state['state'] = self.CLOSED
+                state['failures'] = 0
+                return
+            state['failures'] += 1
+            if state['state'] == self.HALF_OPEN or state['failures'] >= self.failure_threshold:
+                if state['state'] != self.OPEN:
+                    logger.warning(f"Opening circuit for {key} for {self.cooldown}s")
+                state['state'] = self.OPEN
+                state['opened_at'] = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {key: {'state': state['state'], 'failures': state['failures']}
+                    for key, state in self._state.items()}
+
+
+def retry_after_seconds(headers):
+    """Parse a numeric Retry-After header, or None"""
+    value = headers.get('Retry-After') if headers else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
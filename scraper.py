@@ -1,23 +1,284 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+import argparse
+import json
 import os
+import sys
 from datetime import datetime
 import logging
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+import threading
 import time
+import uuid
+
+from artifact_store import STORE_INDEX_PATH, STORE_ROOT, ArtifactStore
+from hierarchy_cache import HierarchyCache, open_backend
+from hierarchy_index import HierarchyIndex, normalize_name
+from metrics import FALLBACKS, LOOKUPS, RESPONSE_BYTES, UPSTREAM_RESPONSES, stage
+from pdf_renderer import get_pdf_renderer
+from rate_limiter import (
+    AdaptiveRateLimiter, CircuitBreaker, CircuitOpenError,
+    endpoint_key, host_key, retry_after_seconds,
+)
+from singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+BASE_URL = os.environ.get('ECOURTS_BASE_URL', "https://services.ecourts.gov.in/ecourtindia_v6/")
+
+# Connection pool settings (overridable through the environment)
+POOL_HOSTS = int(os.environ.get('ECOURTS_POOL_HOSTS', 4))
+POOL_MAXSIZE = int(os.environ.get('ECOURTS_POOL_MAXSIZE', 16))
+POOL_RETRIES = int(os.environ.get('ECOURTS_POOL_RETRIES', 3))
+POOL_BACKOFF = float(os.environ.get('ECOURTS_POOL_BACKOFF', 0.5))
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a bounded keep-alive pool and connect retry/backoff"""
+
+    def __init__(self, pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE,
+                 max_retries=POOL_RETRIES, backoff_factor=POOL_BACKOFF,
+                 limiter=None, breaker=None):
+        super().__init__()
+        self.limiter = limiter if limiter is not None else AdaptiveRateLimiter()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.headers.update(DEFAULT_HEADERS)
+        self.pool_maxsize = pool_maxsize
+        # Only failed connects are retried in here: they never reached
+        # eCourts. Anything upstream answered (5xx included) or stopped
+        # answering goes back through the limiter and breaker, so it is
+        # paced and counted like any other request.
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=0,
+            backoff_factor=backoff_factor,
+            allowed_methods=frozenset(['GET', 'POST']),
+            raise_on_status=False,
+        )
+        # pool_block makes callers wait for a free connection instead of
+        # opening extra, non-reusable ones when the pool for a host is full
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=True,
+        )
+        self.mount('https://', self.adapter)
+        self.mount('http://', self.adapter)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._in_flight = 0
+
+    def request(self, method, url, *args, **kwargs):
+        host = host_key(url)
+        endpoint = endpoint_key(url)
+        self.breaker.before(endpoint)
+        self.limiter.acquire(host)
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+        started = time.monotonic()
+        path = urlparse(url).path
+        try:
+            with stage('http', endpoint=path):
+                response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            UPSTREAM_RESPONSES.inc(endpoint=path, status='error')
+            self.limiter.record(host, None, time.monotonic() - started)
+            self.breaker.record(endpoint, False)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        UPSTREAM_RESPONSES.inc(endpoint=path, status=response.status_code)
+        RESPONSE_BYTES.observe(len(response.content), endpoint=path)
+        self.limiter.record(host, response.status_code, time.monotonic() - started,
+                            retry_after_seconds(response.headers))
+        self.breaker.record(endpoint, response.status_code < 400)
+        return response
+
+    def pool_stats(self):
+        """Snapshot of per-host connection pool usage"""
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'available': pool.pool.qsize() if pool.pool else 0,
+                'maxsize': pool.pool.maxsize if pool.pool else 0,
+            }
+        with self._lock:
+            stats = {
+                'requests': self._requests,
+                'in_flight': self._in_flight,
+                'pool_maxsize': self.pool_maxsize,
+                'hosts': hosts,
+            }
+        stats['rate_limits'] = self.limiter.stats()
+        stats['circuits'] = self.breaker.stats()
+        return stats
+
+
+# Common AJAX endpoints used by eCourts, relative to base_url
+DISTRICT_ENDPOINTS = [
+    'ajax/district_court_complex.php',
+    'ajax/get_district.php',
+    'includes/get_district.php',
+]
+
+# Try different selectors for state dropdown
+STATE_SELECTORS = [
+    'select[name="state_code"]',
+    'select[name="state"]',
+    'select[id*="state"]',
+]
+# Compiled once; tried in order
+STATE_PATTERNS = [soupsieve.compile(selector) for selector in STATE_SELECTORS]
+
+# Only build the parts of the DOM we read
+SELECT_STRAINER = SoupStrainer('select')
+OPTION_STRAINER = SoupStrainer('option')
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+STATE_PLACEHOLDERS = ('Select State', 'Select', '')
+DISTRICT_PLACEHOLDERS = ('Select District', 'Select', '')
+
+
+def district_form(state_value, state_name):
+    """POST body for the district AJAX endpoints"""
+    return {
+        'state_code': state_value,
+        'state_name': state_name,
+        'type': 'district'
+    }
+
+
+def _options_from(element, placeholders):
+    items = []
+    for option in element.find_all('option'):
+        value = option.get('value', '').strip()
+        name = option.get_text(strip=True)
+        if value and name and name not in placeholders:
+            items.append({
+                'name': name,
+                'value': value
+            })
+    return items
+
+
+def parse_options(html, placeholders):
+    """Extract {'name', 'value'} pairs from every <option> in html"""
+    with stage('parse', kind='options'):
+        return _options_from(BeautifulSoup(html, HTML_PARSER, parse_only=OPTION_STRAINER), placeholders)
+
+
+def parse_states(html):
+    """Extract states from the cause list page, or None if no dropdown"""
+    with stage('parse', kind='states'):
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SELECT_STRAINER)
+        for pattern in STATE_PATTERNS:
+            state_select = pattern.select_one(soup)
+            if state_select:
+                return _options_from(state_select, STATE_PLACEHOLDERS)
+        return None
+
+
+_shared_session = None
+_shared_scraper = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_session():
+    """Process-wide pooled session"""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_lock:
+            if _shared_session is None:
+                _shared_session = PooledSession()
+    return _shared_session
+
+
+def get_scraper():
+    """Process-wide scraper used by the Flask routes"""
+    global _shared_scraper
+    if _shared_scraper is None:
+        session = get_shared_session()
+        with _shared_lock:
+            if _shared_scraper is None:
+                cache = HierarchyCache(backend=open_backend(os.environ.get('ECOURTS_CACHE_PATH')))
+                store = ArtifactStore(STORE_ROOT, index_path=STORE_INDEX_PATH)
+                _shared_scraper = ECourtsScraper(session=session, cache=cache, store=store,
+                                                 base_url=os.environ.get('ECOURTS_BASE_URL'))
+    return _shared_scraper
+
+
+def cause_list_job(path, state_name, district_name, complex_name, date_str, cases=None):
+    """Render job for one cause list document (see pdf_renderer.render_document)"""
+    return {
+        'path': path,
+        'title': "eCourts Cause List",
+        'meta': [('State', state_name), ('District', district_name),
+                 ('Court Complex', complex_name), ('Date', date_str)],
+        'heading': "Sample Case List (Mock Data):",
+        'lines': cases or [
+            "1. Case No: ABC/123/2024 - Civil Appeal",
+            "2. Case No: XYZ/456/2024 - Criminal Revision",
+            "3. Case No: DEF/789/2024 - Writ Petition",
+            "4. Case No: GHI/101/2024 - Money Suit",
+            "5. Case No: JKL/202/2024 - Arbitration Case",
+        ],
+        'footer': ["Note: This is a demonstration PDF.",
+                   "Real implementation would download from eCourts website."],
+    }
+
+
 class ECourtsScraper:
-    def __init__(self):
-        self.base_url = "https://services.ecourts.gov.in/ecourtindia_v6/"
-        self.cause_list_url = "https://services.ecourts.gov.in/ecourtindia_v6/?p=cause_list"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        })
+    def __init__(self, session=None, cache=None, store=None, base_url=None, renderer=None):
+        self.base_url = base_url or BASE_URL
+        self.cause_list_url = urljoin(self.base_url, "?p=cause_list")
+        self.session = session if session is not None else PooledSession()
+        self.cache = cache
+        self.store = store
+        self.renderer = renderer if renderer is not None else get_pdf_renderer()
+        self.index = HierarchyIndex()
+        self.inflight = SingleFlight()
+        if cache is not None:
+            cache.add_listener(self._on_hierarchy_update)
+    
+    def after_fork(self):
+        """Drop connections inherited from a parent that preloaded this scraper"""
+        # Pooled sockets would otherwise be shared with the parent and siblings
+        self.session.close()
+        if self.cache is not None:
+            self.cache.after_fork()
+        if self.store is not None:
+            self.store.reopen()
+
+    def pool_stats(self):
+        """Connection pool metrics for the underlying session"""
+        if isinstance(self.session, PooledSession):
+            return self.session.pool_stats()
+        return {}
     
     def get_page(self, url):
         """Get page content with error handling"""
@@ -31,111 +292,135 @@ class ECourtsScraper:
     
     def get_states(self):
         """Extract states from the cause list page"""
+        LOOKUPS.inc(level='states')
+        states = self._cached('states', 'all', self._fetch_states)
+        if not states:
+            FALLBACKS.inc(level='states')
+            states = self._get_fallback_states()
+            if not self.index.has_states():
+                self.index.load_states(states)
+        return states
+    
+    def _fetch_states(self):
+        """Fetch states from upstream, returning None on failure"""
         try:
             html = self.get_page(self.cause_list_url)
             if not html:
-                return self._get_fallback_states()
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Try different selectors for state dropdown
-            state_selectors = [
-                'select[name="state_code"]',
-                'select[name="state"]',
-                'select[id*="state"]'
-            ]
-            
-            state_select = None
-            for selector in state_selectors:
-                state_select = soup.select_one(selector)
-                if state_select:
-                    break
+                return None
             
-            if not state_select:
+            states = parse_states(html)
+            if states is None:
                 logger.warning("State dropdown not found, using fallback data")
-                return self._get_fallback_states()
-            
-            states = []
-            for option in state_select.find_all('option'):
-                value = option.get('value', '').strip()
-                name = option.get_text(strip=True)
-                if value and name and name not in ['Select State', 'Select', '']:
-                    states.append({
-                        'name': name,
-                        'value': value
-                    })
+                return None
             
             logger.info(f"Found {len(states)} states")
-            return states if states else self._get_fallback_states()
+            return states or None
             
         except Exception as e:
             logger.error(f"Error getting states: {str(e)}")
-            return self._get_fallback_states()
+            return None
     
     def get_districts(self, state_name):
         """Get districts for a state"""
-        try:
-            # First, let's try to find the state value
-            states = self.get_states()
-            state_value = None
-            for state in states:
-                if state['name'] == state_name:
-                    state_value = state['value']
-                    break
-            
-            if not state_value:
-                logger.warning(f"State value not found for {state_name}")
-                return self._get_fallback_districts(state_name)
-            
-            # Try different approaches to get districts
-            districts = self._try_ajax_districts(state_value, state_name)
-            if districts:
-                return districts
-            
-            # If AJAX fails, try parsing from main page after state selection
-            return self._get_fallback_districts(state_name)
-            
-        except Exception as e:
-            logger.error(f"Error getting districts for {state_name}: {str(e)}")
+        LOOKUPS.inc(level='districts')
+        with stage('resolve_state'):
+            state_value = self.resolve_state(state_name)
+        if not state_value:
+            logger.warning(f"State value not found for {state_name}")
+            FALLBACKS.inc(level='districts')
             return self._get_fallback_districts(state_name)
+        
+        canonical_name = self.index.state_name(state_value) or state_name
+        districts = self._cached(
+            'districts', state_value,
+            lambda: self._try_ajax_districts(state_value, canonical_name)
+        )
+        if not districts:
+            FALLBACKS.inc(level='districts')
+            districts = self._get_fallback_districts(canonical_name)
+            self.index.load_districts(state_value, districts)
+        return districts
+    
+    def resolve_state(self, state_name):
+        """Map a state name (any case/spacing) to its eCourts code"""
+        if not self.index.has_states():
+            self.index.load_states(self.get_states())
+        return self.index.state_code(state_name)
+    
+    def resolve_district(self, state_name, district_name):
+        """Map a (state, district) name pair to (state_code, district_code)"""
+        state_value = self.resolve_state(state_name)
+        if not state_value:
+            return None, None
+        if not self.index.has_districts(state_value):
+            self.get_districts(state_name)
+        return state_value, self.index.district_code(state_value, district_name)
+    
+    def resolve_court_complex(self, state_name, district_name, complex_name):
+        """Map names to (state_code, district_code, complex_code)"""
+        state_value, district_value = self.resolve_district(state_name, district_name)
+        if not district_value:
+            return state_value, None, None
+        if not self.index.has_complexes(state_value, district_value):
+            self.get_court_complexes(state_name, district_name)
+        return state_value, district_value, self.index.complex_code(state_value, district_value, complex_name)
+    
+    def _on_hierarchy_update(self, level, key, value):
+        """Rebuild the index for a level whenever fresh data arrives"""
+        if level == 'states':
+            self.index.load_states(value)
+        elif level == 'districts':
+            self.index.load_districts(key, value)
+        elif level == 'complexes':
+            state_value, district_value = key.split('/', 1)
+            self.index.load_complexes(state_value, district_value, value)
+    
+    def _ensure_indexed(self, level, key, value):
+        """Index a cached value no store() listener has seen (e.g. read back from disk)"""
+        if not value:
+            return
+        if level == 'states':
+            indexed = self.index.has_states()
+        elif level == 'districts':
+            indexed = self.index.has_districts(key)
+        else:
+            indexed = self.index.has_complexes(*key.split('/', 1))
+        if not indexed:
+            self._on_hierarchy_update(level, key, value)
+    
+    def _cached(self, level, key, loader):
+        """Run loader through the hierarchy cache when one is configured"""
+        if self.cache is None:
+            value = loader()
+            if value:
+                self._on_hierarchy_update(level, key, value)
+            return value
+        value = self.cache.get_or_load(level, key, loader)
+        self._ensure_indexed(level, key, value)
+        return value
     
     def _try_ajax_districts(self, state_value, state_name):
         """Try to get districts via AJAX call"""
         try:
             # Common AJAX endpoints used by eCourts
-            ajax_endpoints = [
-                f"{self.base_url}ajax/district_court_complex.php",
-                f"{self.base_url}ajax/get_district.php",
-                f"{self.base_url}includes/get_district.php"
-            ]
+            ajax_endpoints = [urljoin(self.base_url, path) for path in DISTRICT_ENDPOINTS]
             
             for endpoint in ajax_endpoints:
                 try:
-                    data = {
-                        'state_code': state_value,
-                        'state_name': state_name,
-                        'type': 'district'
-                    }
+                    data = district_form(state_value, state_name)
                     
                     response = self.session.post(endpoint, data=data, timeout=30)
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        options = soup.find_all('option')
-                        
-                        districts = []
-                        for option in options:
-                            value = option.get('value', '').strip()
-                            name = option.get_text(strip=True)
-                            if value and name and name not in ['Select District', 'Select', '']:
-                                districts.append({
-                                    'name': name,
-                                    'value': value
-                                })
+                        districts = parse_options(response.text, DISTRICT_PLACEHOLDERS)
                         
                         if districts:
                             logger.info(f"Found {len(districts)} districts via AJAX")
                             return districts
-                except:
+                except CircuitOpenError as e:
+                    logger.debug(f"Skipping {endpoint}: {str(e)}")
+                    continue
+                except requests.RequestException as e:
+                    logger.warning(f"District endpoint {endpoint} failed: {str(e)}")
                     continue
             
             return None
@@ -149,76 +434,78 @@ class ECourtsScraper:
         try:
             # For now, return fallback data
             # In a complete implementation, this would make AJAX calls similar to districts
-            return self._get_fallback_complexes()
+            LOOKUPS.inc(level='complexes')
+            FALLBACKS.inc(level='complexes')
+            complexes = self._get_fallback_complexes()
+            state_value, district_value = self.resolve_district(state_name, district_name)
+            if district_value and not self.index.has_complexes(state_value, district_value):
+                self.index.load_complexes(state_value, district_value, complexes)
+            return complexes
             
         except Exception as e:
             logger.error(f"Error getting court complexes for {district_name}, {state_name}: {str(e)}")
             return self._get_fallback_complexes()
     
+    def get_courts(self, state_name, district_name, complex_name):
+        """Get the courts inside a court complex"""
+        # Not fetched from upstream yet; an empty list leaves only "All Courts"
+        LOOKUPS.inc(level='courts')
+        return []
+    
+    def get_hierarchy(self, state_name):
+        """Districts, complexes and courts of one state as nested [name, value, children] lists"""
+        tree = []
+        for district in self.get_districts(state_name):
+            complexes = []
+            for court_complex in self.get_court_complexes(state_name, district['name']):
+                courts = self.get_courts(state_name, district['name'], court_complex['name'])
+                complexes.append([court_complex['name'], court_complex['value'],
+                                  [[court['name'], court['value']] for court in courts]])
+            tree.append([district['name'], district['value'], complexes])
+        return tree
+    
     def download_cause_list(self, state_name, district_name, complex_name, date_str):
-        """Download cause list as actual PDF"""
+        """Download cause list as actual PDF.
+        
+        Concurrent calls for the same (state, district, complex, date) share
+        one download instead of racing on the same output file.
+        """
+        key = (normalize_name(state_name), normalize_name(district_name),
+               normalize_name(complex_name), date_str)
+        result, shared = self.inflight.do(
+            key, self._download_cause_list, state_name, district_name, complex_name, date_str
+        )
+        if shared:
+            logger.info(f"Joined in-flight download for {complex_name} on {date_str}")
+        return dict(result)
+    
+    def _download_cause_list(self, state_name, district_name, complex_name, date_str):
+        if self.store is not None:
+            record = self.store.lookup(state_name, district_name, complex_name, date_str)
+            if record is not None:
+                logger.info(f"Serving stored cause list for {complex_name} on {date_str}")
+                return self._stored_result(record, complex_name)
+        
+        tmp_path = None
         try:
             logger.info(f"Downloading cause list for {complex_name} on {date_str}")
             
             # Create a proper PDF file
             filename = f"causelist_{state_name}_{district_name}_{complex_name}_{date_str.replace('-', '_')}.pdf"
             filepath = os.path.join('downloads', filename)
+            # Render to a private temp file and rename into place, so readers
+            # never see a half-written file
+            tmp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
             
-            # Create a simple PDF using reportlab (install: pip install reportlab)
-            try:
-                from reportlab.lib.pagesizes import letter
-                from reportlab.pdfgen import canvas
-                
-                c = canvas.Canvas(filepath, pagesize=letter)
-                width, height = letter
-                
-                # Add content to PDF
-                c.setFont("Helvetica-Bold", 16)
-                c.drawString(100, height - 100, "eCourts Cause List")
-                
-                c.setFont("Helvetica", 12)
-                c.drawString(100, height - 130, f"State: {state_name}")
-                c.drawString(100, height - 150, f"District: {district_name}")
-                c.drawString(100, height - 170, f"Court Complex: {complex_name}")
-                c.drawString(100, height - 190, f"Date: {date_str}")
-                
-                c.setFont("Helvetica", 10)
-                c.drawString(100, height - 230, "Sample Case List (Mock Data):")
-                
-                # Add sample cases
-                cases = [
-                    "1. Case No: ABC/123/2024 - Civil Appeal",
-                    "2. Case No: XYZ/456/2024 - Criminal Revision", 
-                    "3. Case No: DEF/789/2024 - Writ Petition",
-                    "4. Case No: GHI/101/2024 - Money Suit",
-                    "5. Case No: JKL/202/2024 - Arbitration Case"
-                ]
-                
-                y_position = height - 260
-                for case in cases:
-                    c.drawString(120, y_position, case)
-                    y_position -= 20
-                
-                c.drawString(100, y_position - 30, "Note: This is a demonstration PDF.")
-                c.drawString(100, y_position - 50, "Real implementation would download from eCourts website.")
-                
-                c.save()
-                
-            except ImportError:
-                # Fallback: create a text file if reportlab not available
-                logger.warning("reportlab not installed, creating text file instead")
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write("eCourts Cause List\n")
-                    f.write("==================\n\n")
-                    f.write(f"State: {state_name}\n")
-                    f.write(f"District: {district_name}\n") 
-                    f.write(f"Court Complex: {complex_name}\n")
-                    f.write(f"Date: {date_str}\n\n")
-                    f.write("Sample Cases:\n")
-                    f.write("1. Case No: ABC/123/2024 - Civil Appeal\n")
-                    f.write("2. Case No: XYZ/456/2024 - Criminal Revision\n")
-                    f.write("3. Case No: DEF/789/2024 - Writ Petition\n")
-                    f.write("Note: This is a demonstration file.\n")
+            # Rendering runs in the renderer's worker processes
+            with stage('render'):
+                self.renderer.render(cause_list_job(tmp_path, state_name, district_name, complex_name, date_str))
+            
+            if self.store is not None:
+                record = self.store.put(state_name, district_name, complex_name, date_str, tmp_path, filename)
+                return self._stored_result(record, complex_name)
+            
+            os.replace(tmp_path, filepath)
             
             return {
                 'success': True,
@@ -229,11 +516,33 @@ class ECourtsScraper:
             
         except Exception as e:
             logger.error(f"Error downloading cause list: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return {
                 'success': False,
                 'error': f'Download failed: {str(e)}'
             }
     
+    def result_path(self, result):
+        """Local file behind a successful download_cause_list result, or None"""
+        name = result.get('download_url', '').rsplit('/', 1)[-1]
+        if not name:
+            return None
+        if self.store is not None:
+            path = self.store.lookup_blob(name)[0]
+            if path:
+                return path
+        path = os.path.join('downloads', name)
+        return path if os.path.basename(name) == name and os.path.isfile(path) else None
+    
+    def _stored_result(self, record, complex_name):
+        return {
+            'success': True,
+            'filename': record['filename'],
+            'message': f'Cause list downloaded successfully for {complex_name}',
+            'download_url': f"/download/{record['blob']}"
+        }
+    
     def _get_fallback_states(self):
         """Fallback states data"""
         return [
@@ -286,7 +595,42 @@ class ECourtsScraper:
             {'name': 'Commercial Court', 'value': '5'}
         ]
 
-def main():
+def harvest(args):
+    """Bulk-download cause lists for a hierarchy selector and date range"""
+    from harvester import CauseListHarvester, build_tasks
+    
+    scraper = get_scraper()
+    start_date = args.start or datetime.now().strftime('%d-%m-%Y')
+    tasks = build_tasks(scraper, args.state, start_date, args.days, args.district, args.complex)
+    harvester = CauseListHarvester(scraper, workers=args.workers, per_host=args.per_host)
+    
+    def progress(done, failed, rate):
+        print(f"\r{done} done, {failed} failed, {rate:.0f}/hour", end='', file=sys.stderr, flush=True)
+    
+    for result in harvester.run(tasks, progress=progress):
+        print(json.dumps(result), flush=True)
+    print(file=sys.stderr)
+
+def parse(args):
+    """Convert cause list files into typed records (JSON Lines/CSV/Parquet)"""
+    from causelist_parser import parse_file, write_entries
+    
+    def entries():
+        for path in args.files:
+            yield from parse_file(path)
+    
+    count = write_entries(entries(), args.output, args.format)
+    print(f"Wrote {count} entries to {args.output}")
+
+def export(args):
+    """Write one merged cause list for several complexes and days"""
+    from merged_export import MergedExport
+    
+    complexes = [(args.district, name) for name in args.complex]
+    result = MergedExport(get_scraper()).export(args.state, complexes, args.start, args.days, args.format)
+    print(json.dumps(result))
+
+def test_scraper():
     """Test the scraper"""
     scraper = ECourtsScraper()
     
@@ -305,5 +649,46 @@ def main():
     
     print("\n✅ Scraper test completed!")
 
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='eCourts cause list scraper')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    harvest_parser = subparsers.add_parser('harvest', help='Bulk-download cause lists (results as JSON lines)')
+    harvest_parser.add_argument('--state', action='append', required=True,
+                                help="State name (repeatable); '*' for all states")
+    harvest_parser.add_argument('--district', action='append', help='Restrict to district (repeatable)')
+    harvest_parser.add_argument('--complex', action='append', help='Restrict to court complex (repeatable)')
+    harvest_parser.add_argument('--start', help='First date, DD-MM-YYYY (default: today)')
+    harvest_parser.add_argument('--days', type=int, default=1, help='Number of days to fetch')
+    harvest_parser.add_argument('--workers', type=int, default=8, help='Concurrent downloads')
+    harvest_parser.add_argument('--per-host', type=int, default=4, help='Concurrent downloads per upstream host')
+    
+    parse_parser = subparsers.add_parser('parse', help='Convert cause list files to JSON Lines/CSV/Parquet')
+    parse_parser.add_argument('files', nargs='+', help='Cause list files (.json, .html, .pdf, .txt)')
+    parse_parser.add_argument('-o', '--output', required=True, help='Output file')
+    parse_parser.add_argument('--format', choices=['jsonl', 'csv', 'parquet'],
+                              help='Output format (default: from output extension)')
+    
+    export_parser = subparsers.add_parser('export', help='Merge several complexes and days into one PDF/JSON')
+    export_parser.add_argument('--state', required=True)
+    export_parser.add_argument('--district', required=True)
+    export_parser.add_argument('--complex', action='append', required=True, help='Court complex (repeatable)')
+    export_parser.add_argument('--start', required=True, help='First date, DD-MM-YYYY')
+    export_parser.add_argument('--days', type=int, default=1)
+    export_parser.add_argument('--format', choices=['pdf', 'json'], default='pdf')
+    
+    args = parser.parse_args(argv)
+    if args.command == 'harvest':
+        os.makedirs('downloads', exist_ok=True)
+        harvest(args)
+    elif args.command == 'parse':
+        parse(args)
+    elif args.command == 'export':
+        os.makedirs('downloads', exist_ok=True)
+        export(args)
+    else:
+        test_scraper()
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,327 @@
+"""Full-text and field index over parsed cause list entries (SQLite FTS5).
+
+    python search_index.py ingest downloads/ [more files or dirs]
+    python search_index.py search "sharma" [--judge verma] [--from 01-10-2025]
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from artifact_store import STORE_INDEX_PATH, STORE_ROOT, ArtifactStore
+from causelist_parser import FIELDS, parse_file
+from hierarchy_index import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Outside the served downloads/, so the index is only reachable through /api/search
+INDEX_PATH = os.environ.get('ECOURTS_SEARCH_INDEX', os.path.join('data', 'search_index.sqlite'))
+MAX_PER_PAGE = 100
+# Text matches above this many rows are walked in date order instead of sorted
+DENSE_MATCHES = 5000
+INGEST_BATCH = 5000
+INDEXABLE = ('.json', '.pdf', '.html', '.htm', '.txt')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    entries INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    date_key TEXT,
+    state TEXT, district TEXT, court_complex TEXT, date TEXT,
+    serial_no INTEGER, case_number TEXT, petitioner TEXT, respondent TEXT,
+    court_room TEXT, judge_name TEXT, hearing_time TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_source ON entries(source);
+CREATE INDEX IF NOT EXISTS entries_date ON entries(date_key, serial_no);
+CREATE INDEX IF NOT EXISTS entries_case ON entries(case_number COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS entries_room ON entries(court_room COLLATE NOCASE, date_key);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    case_number, petitioner, respondent, judge_name, court_room,
+    content='entries', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 2 tokenchars '/-'", prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, case_number, petitioner, respondent, judge_name, court_room)
+    VALUES (new.id, new.case_number, new.petitioner, new.respondent, new.judge_name, new.court_room);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, case_number, petitioner, respondent, judge_name, court_room)
+    VALUES ('delete', old.id, old.case_number, old.petitioner, old.respondent, old.judge_name, old.court_room);
+END;
+'''
+
+_TOKEN = re.compile(r"[\w/-]+", re.UNICODE)
+_DATE = re.compile(r'^(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})$')
+
+
+def artifact_source(state, district, court_complex, date):
+    """Source key of a stored cause list, shared by the server and the ingest CLI"""
+    return 'artifact:' + '|'.join((normalize_name(state), normalize_name(district),
+                                   normalize_name(court_complex), date))
+
+
+def date_key(value):
+    """DD-MM-YYYY (or YYYY-MM-DD) -> YYYY-MM-DD, so dates sort and range-compare"""
+    if not value:
+        return None
+    value = str(value).strip()
+    match = _DATE.match(value)
+    if match:
+        day, month, year = match.groups()
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    return value if re.match(r'^\d{4}-\d{2}-\d{2}$', value) else None
+
+
+def match_expression(text, columns=None):
+    """User text -> safe FTS5 query: every word must match (as a prefix)"""
+    terms = [f'"{token}"*' for token in _TOKEN.findall(text or '')]
+    if not terms:
+        return None
+    expression = ' AND '.join(terms)
+    if columns:
+        return '{' + ' '.join(columns) + '}: (' + expression + ')'
+    return expression
+
+
+class SearchIndex:
+    """Incremental SQLite FTS5 index of cause list entries.
+
+    Files are re-indexed only when their size or mtime changes; a
+    re-indexed source replaces its previous rows. Text fields (case
+    number, parties, judge, court room) go into an FTS5 table with prefix
+    indexes; dates are stored as sortable YYYY-MM-DD keys. Searches fetch
+    one extra row instead of counting all matches; common terms walk the
+    date index so a page stays cheap however many entries match.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    def ingest_entries(self, entries, source, size=None, mtime=None):
+        """Replace the rows of `source` with entries; returns the number indexed"""
+        columns = ('source', 'date_key') + FIELDS
+        insert = f"INSERT INTO entries ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        count = 0
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE source = ?', (source,))
+            batch = []
+            for entry in entries:
+                batch.append((source, date_key(entry.date)) + tuple(getattr(entry, field) for field in FIELDS))
+                if len(batch) >= INGEST_BATCH:
+                    self._conn.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._conn.executemany(insert, batch)
+                count += len(batch)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sources (source, size, mtime, entries, indexed_at) VALUES (?, ?, ?, ?, ?)',
+                (source, size, mtime, count, time.time()),
+            )
+        return count
+
+    def ingest_file(self, path, metadata=None, source=None, force=False):
+        """Index one cause list file unless it is unchanged since the last ingest"""
+        source = source or os.path.abspath(path)
+        stat = os.stat(path)
+        if not force:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT size, mtime FROM sources WHERE source = ?', (source,)
+                ).fetchone()
+            if row is not None and row['size'] == stat.st_size and row['mtime'] == stat.st_mtime:
+                return 0
+        try:
+            entries = parse_file(path, metadata)
+            return self.ingest_entries(entries, source, stat.st_size, stat.st_mtime)
+        except Exception as e:
+            logger.error(f"Could not index {path}: {str(e)}")
+            return 0
+
+    def ingest_paths(self, paths, store=None):
+        """Index files and (recursively) directories; returns (files indexed, entries).
+
+        Blobs of `store` are indexed once per cause list stored as them,
+        under the same source key the server uses (artifact_source), so
+        running this over downloads/ does not index them a second time.
+        """
+        files = entries = 0
+        for path in paths:
+            if os.path.isdir(path):
+                candidates = (
+                    os.path.join(root, name)
+                    for root, _, names in os.walk(path) for name in sorted(names)
+                    if name.lower().endswith(INDEXABLE)
+                )
+            else:
+                candidates = [path]
+            for candidate in candidates:
+                if store is not None and os.path.dirname(os.path.abspath(candidate)) == store.root:
+                    keys = store.artifacts_for_blob(os.path.basename(candidate))
+                    counts = [self.ingest_file(candidate, {'date': key[3]}, source=artifact_source(*key))
+                              for key in keys]
+                    count = sum(counts)
+                else:
+                    count = self.ingest_file(candidate)
+                if count:
+                    files += 1
+                    entries += count
+        return files, entries
+
+    def remove_source(self, source):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE source = ?', (source,))
+            self._conn.execute('DELETE FROM sources WHERE source = ?', (source,))
+
+    def search(self, q=None, case_number=None, party=None, judge=None, court_room=None,
+               date_from=None, date_to=None, state=None, district=None, court_complex=None,
+               page=1, per_page=20):
+        """Page of matching entries, newest date first.
+
+        q matches any indexed text field; party/judge restrict matching to
+        those fields. Returns {'results', 'page', 'per_page', 'has_more'}.
+        """
+        page = max(1, int(page))
+        per_page = max(1, min(int(per_page), MAX_PER_PAGE))
+
+        matches = [
+            match_expression(q),
+            match_expression(party, ['petitioner', 'respondent']),
+            match_expression(judge, ['judge_name']),
+        ]
+        matches = [expression for expression in matches if expression]
+
+        where, params = [], []
+        dense = False
+        if matches:
+            expression = ' AND '.join(f'({expression})' for expression in matches)
+            where.append('e.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)')
+            params.append(expression)
+            dense = not (case_number or court_room) and self._match_count(expression) >= DENSE_MATCHES
+        if case_number:
+            where.append('e.case_number = ? COLLATE NOCASE')
+            params.append(case_number.strip())
+        if court_room:
+            where.append('e.court_room = ? COLLATE NOCASE')
+            params.append(court_room.strip())
+        for column, value in (('state', state), ('district', district), ('court_complex', court_complex)):
+            if value:
+                where.append(f'e.{column} = ? COLLATE NOCASE')
+                params.append(value.strip())
+        if date_key(date_from):
+            where.append('e.date_key >= ?')
+            params.append(date_key(date_from))
+        if date_key(date_to):
+            where.append('e.date_key <= ?')
+            params.append(date_key(date_to))
+
+        query = f"SELECT {', '.join('e.' + field for field in FIELDS)} FROM entries e"
+        if dense:
+            # Common terms: walking the date index stops after one page,
+            # sorting every match would not
+            query += ' INDEXED BY entries_date'
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        query += ' ORDER BY e.date_key DESC, e.serial_no LIMIT ? OFFSET ?'
+        params += [per_page + 1, (page - 1) * per_page]
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {
+            'results': [dict(row) for row in rows[:per_page]],
+            'page': page,
+            'per_page': per_page,
+            'has_more': len(rows) > per_page,
+        }
+
+    def _match_count(self, expression):
+        """Number of FTS matches, counted only up to DENSE_MATCHES"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ? LIMIT ?)',
+                (expression, DENSE_MATCHES),
+            ).fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            sources, entries = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(entries), 0) FROM sources'
+            ).fetchone()
+        return {'sources': sources, 'entries': entries}
+
+    def optimize(self):
+        """Merge FTS segments (worth running after big ingests)"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('optimize')")
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Process-wide search index used by the Flask routes"""
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = SearchIndex()
+    return _search_index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Index and search harvested cause lists')
+    parser.add_argument('--db', default=INDEX_PATH)
+    parser.add_argument('--store', default=STORE_ROOT, help='Artifact store whose blobs are keyed by cause list')
+    parser.add_argument('--store-index', default=STORE_INDEX_PATH)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    ingest_parser = subparsers.add_parser('ingest', help='Index cause list files or directories')
+    ingest_parser.add_argument('paths', nargs='+')
+    search_parser = subparsers.add_parser('search', help='Query the index')
+    search_parser.add_argument('q', nargs='?')
+    search_parser.add_argument('--party')
+    search_parser.add_argument('--judge')
+    search_parser.add_argument('--case-number')
+    search_parser.add_argument('--court-room')
+    search_parser.add_argument('--from', dest='date_from')
+    search_parser.add_argument('--to', dest='date_to')
+    search_parser.add_argument('--page', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(args.db)
+    if args.command == 'ingest':
+        store = ArtifactStore(args.store, index_path=args.store_index) if os.path.isdir(args.store) else None
+        files, entries = index.ingest_paths(args.paths, store)
+        index.optimize()
+        print(f"Indexed {entries} entries from {files} changed files ({index.stats()['entries']} total)")
+    else:
+        started = time.perf_counter()
+        page = index.search(args.q, args.case_number, args.party, args.judge, args.court_room,
+                            args.date_from, args.date_to, page=args.page)
+        for row in page['results']:
+            print(json.dumps(row, ensure_ascii=False))
+        print(f"page {page['page']}, more: {page['has_more']}, {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -35,6 +35,94 @@ async function loadStates() {
   }
 }
 
+// Cached hierarchy trees live in localStorage under this prefix + state name
+const HIERARCHY_CACHE_PREFIX = "ecourts:hierarchy:v1:";
+const HIERARCHY_MAX_AGE_MS = 7 * 24 * 3600 * 1000;
+
+// Tree of the selected state: {state, version, districts}. Districts are
+// [name, value, complexes], complexes [name, value, courts], courts [name, value]
+let currentHierarchy = null;
+
+function readCachedHierarchy(state) {
+  try {
+    const cached = JSON.parse(
+      localStorage.getItem(HIERARCHY_CACHE_PREFIX + state)
+    );
+    if (cached && Date.now() - cached.savedAt < HIERARCHY_MAX_AGE_MS) {
+      return cached;
+    }
+  } catch (error) {
+    console.warn("Ignoring unreadable cached hierarchy:", error);
+  }
+  return null;
+}
+
+function storeHierarchy(state, hierarchy) {
+  try {
+    localStorage.setItem(
+      HIERARCHY_CACHE_PREFIX + state,
+      JSON.stringify({
+        version: hierarchy.version,
+        districts: hierarchy.districts,
+        savedAt: Date.now(),
+      })
+    );
+  } catch (error) {
+    // Storage full or disabled: the tree is still used for this page
+    console.warn("Could not cache hierarchy:", error);
+  }
+}
+
+// Fetch a state's whole tree in one request, revalidating a cached copy by version
+async function fetchHierarchy(state, cached) {
+  const headers = cached ? { "If-None-Match": `"${cached.version}"` } : {};
+  const response = await fetch(
+    `/api/hierarchy/${encodeURIComponent(state)}`,
+    { headers: headers }
+  );
+
+  if (response.status === 304 && cached) {
+    storeHierarchy(state, cached);
+    return cached;
+  }
+
+  const data = await response.json();
+  if (!data.success) {
+    throw new Error(data.error || "Failed to load districts");
+  }
+  const hierarchy = { version: data.version, districts: data.districts };
+  storeHierarchy(state, hierarchy);
+  return hierarchy;
+}
+
+function fillSelect(select, placeholder, nodes) {
+  select.innerHTML = placeholder;
+  nodes.forEach((node) => {
+    const option = document.createElement("option");
+    option.value = node[0];
+    option.textContent = node[0];
+    select.appendChild(option);
+  });
+  select.disabled = false;
+}
+
+function findNode(nodes, name) {
+  return nodes.find((node) => node[0] === name);
+}
+
+function showDistricts(state, hierarchy) {
+  currentHierarchy = { state: state, ...hierarchy };
+  fillSelect(
+    document.getElementById("district"),
+    '<option value="">Select District</option>',
+    hierarchy.districts
+  );
+  resetDependentFields([
+    document.getElementById("courtComplex"),
+    document.getElementById("courtName"),
+  ]);
+}
+
 // Load districts based on selected state
 async function loadDistricts() {
   const stateSelect = document.getElementById("state");
@@ -43,35 +131,42 @@ async function loadDistricts() {
   const courtSelect = document.getElementById("courtName");
 
   const selectedState = stateSelect.value;
+  currentHierarchy = null;
 
   if (!selectedState) {
     resetDependentFields([districtSelect, complexSelect, courtSelect]);
     return;
   }
 
+  const cached = readCachedHierarchy(selectedState);
+  if (cached) {
+    showDistricts(selectedState, cached);
+    // Revalidate in the background; only redraw if nothing was picked meanwhile
+    fetchHierarchy(selectedState, cached)
+      .then((fresh) => {
+        if (
+          fresh.version !== cached.version &&
+          stateSelect.value === selectedState
+        ) {
+          if (districtSelect.value) {
+            currentHierarchy = { state: selectedState, ...fresh };
+          } else {
+            showDistricts(selectedState, fresh);
+          }
+        }
+      })
+      .catch((error) => console.warn("Hierarchy revalidation failed:", error));
+    return;
+  }
+
   showLoading("Loading districts...");
 
   try {
-    const response = await fetch(
-      `/api/districts/${encodeURIComponent(selectedState)}`
-    );
-    const data = await response.json();
-
-    if (data.success) {
-      districtSelect.innerHTML = '<option value="">Select District</option>';
-      data.data.forEach((district) => {
-        const option = document.createElement("option");
-        option.value = district.name;
-        option.textContent = district.name;
-        districtSelect.appendChild(option);
-      });
-
-      districtSelect.disabled = false;
-      resetDependentFields([complexSelect, courtSelect]);
-      hideLoading();
-    } else {
-      throw new Error(data.error || "Failed to load districts");
+    const hierarchy = await fetchHierarchy(selectedState, null);
+    if (stateSelect.value === selectedState) {
+      showDistricts(selectedState, hierarchy);
     }
+    hideLoading();
   } catch (error) {
     hideLoading();
     showAlert("Error loading districts: " + error.message, "danger");
@@ -79,99 +174,48 @@ async function loadDistricts() {
   }
 }
 
-// Load court complexes based on selected district
-async function loadCourtComplexes() {
-  const stateSelect = document.getElementById("state");
+// Load court complexes based on selected district (from the state's tree)
+function loadCourtComplexes() {
   const districtSelect = document.getElementById("district");
   const complexSelect = document.getElementById("courtComplex");
   const courtSelect = document.getElementById("courtName");
 
-  const selectedState = stateSelect.value;
-  const selectedDistrict = districtSelect.value;
+  const district =
+    currentHierarchy && findNode(currentHierarchy.districts, districtSelect.value);
 
-  if (!selectedState || !selectedDistrict) {
+  if (!district) {
     resetDependentFields([complexSelect, courtSelect]);
     return;
   }
 
-  showLoading("Loading court complexes...");
-
-  try {
-    const response = await fetch(
-      `/api/court-complexes/${encodeURIComponent(
-        selectedState
-      )}/${encodeURIComponent(selectedDistrict)}`
-    );
-    const data = await response.json();
-
-    if (data.success) {
-      complexSelect.innerHTML =
-        '<option value="">Select Court Complex</option>';
-      data.data.forEach((complex) => {
-        const option = document.createElement("option");
-        option.value = complex.name;
-        option.textContent = complex.name;
-        complexSelect.appendChild(option);
-      });
-
-      complexSelect.disabled = false;
-      resetDependentFields([courtSelect]);
-      hideLoading();
-    } else {
-      throw new Error(data.error || "Failed to load court complexes");
-    }
-  } catch (error) {
-    hideLoading();
-    showAlert("Error loading court complexes: " + error.message, "danger");
-    resetDependentFields([complexSelect, courtSelect]);
-  }
+  fillSelect(
+    complexSelect,
+    '<option value="">Select Court Complex</option>',
+    district[2]
+  );
+  resetDependentFields([courtSelect]);
 }
 
-// Load courts based on selected court complex
-async function loadCourts() {
-  const stateSelect = document.getElementById("state");
+// Load courts based on selected court complex (from the state's tree)
+function loadCourts() {
   const districtSelect = document.getElementById("district");
   const complexSelect = document.getElementById("courtComplex");
   const courtSelect = document.getElementById("courtName");
 
-  const selectedState = stateSelect.value;
-  const selectedDistrict = districtSelect.value;
-  const selectedComplex = complexSelect.value;
+  const district =
+    currentHierarchy && findNode(currentHierarchy.districts, districtSelect.value);
+  const complex = district && findNode(district[2], complexSelect.value);
 
-  if (!selectedState || !selectedDistrict || !selectedComplex) {
+  if (!complex) {
     resetDependentFields([courtSelect]);
     return;
   }
 
-  showLoading("Loading courts...");
-
-  try {
-    const response = await fetch(
-      `/api/courts/${encodeURIComponent(selectedState)}/${encodeURIComponent(
-        selectedDistrict
-      )}/${encodeURIComponent(selectedComplex)}`
-    );
-    const data = await response.json();
-
-    if (data.success) {
-      courtSelect.innerHTML = '<option value="All Courts">All Courts</option>';
-      data.data.forEach((court) => {
-        const option = document.createElement("option");
-        option.value = court.name;
-        option.textContent = court.name;
-        courtSelect.appendChild(option);
-      });
-
-      courtSelect.disabled = false;
-      hideLoading();
-    } else {
-      throw new Error(data.error || "Failed to load courts");
-    }
-  } catch (error) {
-    hideLoading();
-    showAlert("Error loading courts: " + error.message, "danger");
-    resetDependentFields([courtSelect]);
-  }
+  fillSelect(
+    courtSelect,
+    '<option value="All Courts">All Courts</option>',
+    complex[2]
+  );
 }
 
 // Form submission handler
@@ -226,7 +270,7 @@ async function downloadCauseListPDF(downloadData) {
     const data = await response.json();
 
     if (data.success) {
-      startStatusCheck();
+      startStatusCheck(data.job_id);
     } else {
       hideProgressSection();
       showAlert(
@@ -241,13 +285,16 @@ async function downloadCauseListPDF(downloadData) {
 }
 
 // Start checking download status
-function startStatusCheck() {
-  let progress = 0;
+function startStatusCheck(jobId) {
   statusCheckInterval = setInterval(() => {
-    fetch("/api/status")
+    fetch(`/api/status/${encodeURIComponent(jobId)}`)
       .then((response) => response.json())
       .then((status) => {
-        if (status.status === "completed") {
+        if (!status.success) {
+          clearInterval(statusCheckInterval);
+          hideProgressSection();
+          showAlert(status.error || "Download job was lost", "danger");
+        } else if (status.status === "done") {
           clearInterval(statusCheckInterval);
           updateProgress(100, "PDF download completed!");
 
@@ -259,9 +306,8 @@ function startStatusCheck() {
           updateProgress(0, status.message);
           showAlert(status.message, "danger");
           setTimeout(hideProgressSection, 3000);
-        } else if (status.status === "running") {
-          progress = Math.min(progress + 10, 90);
-          updateProgress(progress, status.message);
+        } else {
+          updateProgress(status.progress, status.message);
         }
       })
       .catch((error) => {
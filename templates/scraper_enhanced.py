@@ -4,57 +4,57 @@ import json
 import time
 import os
 from datetime import datetime, timedelta
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import base64
 import logging
 from PIL import Image
 import io
 import threading
 
+from browser_pool import create_driver, get_browser_pool
+from browser_waits import timed_wait, wait_for_any, wait_for_network_idle, wait_for_staleness
+from captcha_session import get_captcha_sessions
+from captcha_solver import SampleCollector, get_captcha_solver
+from case_tracker import fetch_case_html, parse_case_fields
+
 logger = logging.getLogger(__name__)
 
 class ECourtsScraperEnhanced:
-    def __init__(self, headless=False):  # Set to False for CAPTCHA solving
+    def __init__(self, headless=False, pool=None, sessions=None):  # Set to False for CAPTCHA solving
         self.base_url = "https://services.ecourts.gov.in/ecourtindia_v6/"
         self.headless = headless
         self.driver = None
         self.captcha_solved = False
-        self.manual_mode = True  # Use manual CAPTCHA solving by default
+        self.manual_mode = False  # Try the local solver first; low confidence falls back to manual
+        self.pool = pool if pool is not None else get_browser_pool()
+        self.browser = None
+        # Cookies of the last solved CAPTCHA, shared with the requests-based scraper
+        self.sessions = sessions if sessions is not None else get_captcha_sessions()
+    
+    @classmethod
+    def for_captcha_session(cls, pool, session_id, sessions=None):
+        """Rebuild a scraper around the browser pinned to a CAPTCHA session"""
+        browser = pool.checkout(session_id=session_id)
+        if browser is None:
+            return None
+        scraper = cls(headless=True, pool=pool, sessions=sessions)
+        scraper.browser = browser
+        scraper.driver = browser.driver
+        if 'current_captcha' in browser.state:
+            scraper.current_captcha = browser.state['current_captcha']
+        return scraper
     
     def setup_driver(self):
         """Setup Chrome driver for CAPTCHA handling"""
         try:
-            chrome_options = Options()
-            
-            if self.headless:
-                chrome_options.add_argument('--headless')
-            
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # Important for CAPTCHA handling
-            chrome_options.add_argument('--disable-extensions')
-            chrome_options.add_argument('--disable-popup-blocking')
-            chrome_options.add_argument('--window-size=1200,800')
-            
-            # Automatic ChromeDriver management
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.set_page_load_timeout(45)
-            self.driver.set_script_timeout(30)
-            
+            if self.pool is not None:
+                self.browser = self.pool.checkout()
+                self.driver = self.browser.driver
+            else:
+                self.driver = create_driver(headless=self.headless)
             return self.driver
             
         except Exception as e:
@@ -76,6 +76,9 @@ class ECourtsScraperEnhanced:
                     success = self.solve_captcha_manual_enhanced(captcha_image)
                 else:
                     success = self.solve_captcha_automated(captcha_image)
+                    if success is None:
+                        # Not confident enough: hand this one to a human
+                        return self.solve_captcha_manual_enhanced(captcha_image)
                 
                 if success:
                     self.captcha_solved = True
@@ -85,7 +88,9 @@ class ECourtsScraperEnhanced:
                     refresh_btn = self.driver.find_elements(By.XPATH, "//a[contains(text(), 'Refresh') or contains(@onclick, 'captcha')]")
                     if refresh_btn:
                         refresh_btn[0].click()
-                        time.sleep(2)
+                        # Done as soon as the old image is swapped out
+                        with timed_wait('captcha_refresh'):
+                            wait_for_staleness(self.driver, captcha_image, attribute='src')
                     
             except TimeoutException:
                 logger.info("No CAPTCHA detected")
@@ -93,6 +98,11 @@ class ECourtsScraperEnhanced:
             except Exception as e:
                 logger.error(f"CAPTCHA solving attempt {attempt + 1} failed: {str(e)}")
         
+        if not self.manual_mode:
+            # The local solver kept getting it wrong: hand the current one to a human
+            images = self.driver.find_elements(By.XPATH, "//img[contains(@src, 'captcha') or contains(@id, 'captcha')]")
+            if images:
+                return self.solve_captcha_manual_enhanced(images[0])
         return False
     
     def solve_captcha_manual_enhanced(self, captcha_element):
@@ -188,6 +198,9 @@ class ECourtsScraperEnhanced:
                 "button[contains(text(), 'Search')]"
             ]
             
+            old_url = self.driver.current_url
+            old_captcha = self.driver.find_elements(By.XPATH, "//img[contains(@src, 'captcha')]")
+            
             for selector in submit_buttons:
                 try:
                     submit_btn = self.driver.find_element(By.CSS_SELECTOR, selector)
@@ -197,8 +210,16 @@ class ECourtsScraperEnhanced:
                 except:
                     continue
             
-            # Wait for page to load and check if CAPTCHA was successful
-            time.sleep(3)
+            # Wait for navigation, the CAPTCHA being replaced, or an error message
+            with timed_wait('captcha_submit'):
+                conditions = [
+                    lambda d: d.current_url != old_url,
+                    lambda d: d.find_elements(By.XPATH, "//*[contains(text(), 'Invalid Captcha')]"),
+                ]
+                if old_captcha:
+                    conditions.append(EC.staleness_of(old_captcha[0]))
+                wait_for_any(self.driver, conditions)
+                wait_for_network_idle(self.driver)
             
             # Check if we're still on CAPTCHA page
             if self.is_captcha_page():
@@ -207,9 +228,12 @@ class ECourtsScraperEnhanced:
             else:
                 logger.info("CAPTCHA solved successfully")
                 self.captcha_solved = True
+                self.sessions.adopt(self.driver)
+                
+                self.collect_sample(captcha_text)
                 
                 # Clean up CAPTCHA image
-                if os.path.exists(self.current_captcha['path']):
+                if self.current_captcha['path'] and os.path.exists(self.current_captcha['path']):
                     os.remove(self.current_captcha['path'])
                 
                 return True
@@ -228,23 +252,44 @@ class ECourtsScraperEnhanced:
             return False
     
     def solve_captcha_automated(self, captcha_element):
-        """Attempt automated CAPTCHA solving (basic implementation)"""
+        """Solve with the local OCR model.
+        
+        Returns True/False for an accepted/rejected answer, or None when the
+        model is not confident enough to try (caller falls back to manual).
+        """
         try:
-            # This is a simplified version - in production, you'd use a CAPTCHA solving service
-            logger.info("Attempting automated CAPTCHA solving...")
-            
-            # Get CAPTCHA image as base64
-            captcha_screenshot = captcha_element.screenshot_as_png
+            captcha_png = captcha_element.screenshot_as_png
+            result = get_captcha_solver().solve(captcha_png)
+            logger.info(f"Local CAPTCHA solver: {result['text']!r} confidence {result['confidence']:.2f} "
+                        f"in {result['seconds'] * 1000:.0f} ms")
+            if not result['accepted']:
+                return None
             
-            # Simple OCR attempt (this won't work for complex CAPTCHAs)
-            # In real implementation, you'd use a service like 2captcha.com
-            
-            # For now, return False to fall back to manual solving
-            return False
+            self.current_captcha = {
+                'filename': None,
+                'path': None,
+                'png': captcha_png,
+                'source': 'auto',
+                'input_field': self.find_captcha_input_field(),
+                'timestamp': time.time()
+            }
+            return self.submit_captcha_solution(result['text'])
             
         except Exception as e:
             logger.error(f"Automated CAPTCHA solving failed: {str(e)}")
-            return False
+            return None
+    
+    def collect_sample(self, captcha_text):
+        """Keep an accepted CAPTCHA and its answer as a labelled sample"""
+        try:
+            captcha_png = self.current_captcha.get('png')
+            if captcha_png is None and self.current_captcha.get('path') and os.path.exists(self.current_captcha['path']):
+                with open(self.current_captcha['path'], 'rb') as f:
+                    captcha_png = f.read()
+            if captcha_png:
+                SampleCollector().add(captcha_png, captcha_text, source=self.current_captcha.get('source', 'manual'))
+        except Exception as e:
+            logger.error(f"Could not store CAPTCHA sample: {str(e)}")
     
     def search_with_captcha_handling(self, search_function, *args, **kwargs):
         """Wrapper function to handle CAPTCHA during search"""
@@ -254,17 +299,38 @@ class ECourtsScraperEnhanced:
             
             # Navigate to eCourts
             self.driver.get(self.base_url)
-            time.sleep(3)
+            with timed_wait('page_load'):
+                wait_for_network_idle(self.driver)
+            
+            # Carry over an already-solved session instead of solving again
+            resumed = self.sessions.apply_to(self.driver)
+            if resumed:
+                self.driver.get(self.base_url)
+                with timed_wait('page_load'):
+                    wait_for_network_idle(self.driver)
             
             # Handle CAPTCHA
-            captcha_success = self.detect_and_solve_captcha()
+            if resumed and not self.is_captcha_page():
+                captcha_success = True
+            else:
+                if resumed:
+                    self.sessions.invalidate('(browser was shown the CAPTCHA)')
+                captcha_success = self.detect_and_solve_captcha()
             
             if not captcha_success and hasattr(self, 'current_captcha'):
-                # CAPTCHA needs manual solving
+                # CAPTCHA needs manual solving; keep this browser for the answer
+                session_id = None
+                if self.browser is not None:
+                    session_id = generate_captcha_session()
+                    self.browser.state['current_captcha'] = self.current_captcha
+                    self.pool.pin(self.browser, session_id)
+                    self.browser = None
+                    self.driver = None
                 return {
                     'success': False,
                     'captcha_required': True,
                     'captcha_image': self.current_captcha['filename'],
+                    'session_id': session_id,
                     'message': 'CAPTCHA solving required'
                 }
             
@@ -277,9 +343,29 @@ class ECourtsScraperEnhanced:
                 'success': False,
                 'error': f'Search failed: {str(e)}'
             }
+        finally:
+            self.release_driver()
+    
+    def search_by_cnr_http(self, cnr_number):
+        """CNR search over the shared authenticated session; None if it needs a browser"""
+        try:
+            html = fetch_case_html(cnr_number, self.sessions)
+            if html is None:
+                return None
+            soup = BeautifulSoup(html, 'html.parser')
+            if soup.find('table') is None:
+                return None
+            return self.parse_case_results(soup, cnr_number)
+        except Exception as e:
+            logger.error(f"CNR search over shared session failed: {str(e)}")
+            return None
     
     def search_by_cnr_enhanced(self, cnr_number):
         """CNR search with enhanced CAPTCHA handling"""
+        result = self.search_by_cnr_http(cnr_number)
+        if result is not None:
+            return result
+        
         def actual_search():
             try:
                 # Find CNR input field
@@ -309,9 +395,26 @@ class ECourtsScraperEnhanced:
         
         return self.search_with_captcha_handling(actual_search)
     
+    def parse_case_results(self, soup, cnr_number):
+        """Case status page -> result dict with the parsed fields"""
+        case = parse_case_fields(soup)
+        if not case:
+            return {'success': False, 'error': f'No case details found for {cnr_number}'}
+        case.setdefault('cnr_number', cnr_number)
+        return {'success': True, 'cnr_number': cnr_number, 'case': case}
+    
+    def release_driver(self):
+        """Give a pooled browser back to the pool (no-op without a pool)"""
+        if self.browser is not None:
+            self.pool.checkin(self.browser)
+            self.browser = None
+            self.driver = None
+    
     def close_driver(self):
         """Close the browser driver"""
-        if self.driver:
+        if self.browser is not None:
+            self.release_driver()
+        elif self.driver:
             self.driver.quit()
             self.driver = None
 
@@ -330,8 +433,8 @@ def captcha_required():
     data = request.json
     captcha_image = data.get('captcha_image')
     
-    # Generate session for this CAPTCHA attempt
-    session_id = generate_captcha_session()
+    # Reuse the session id the scraper pinned its browser to, if any
+    session_id = data.get('session_id') or generate_captcha_session()
     session[session_id] = {
         'captcha_image': captcha_image,
         'timestamp': time.time(),
@@ -358,12 +461,25 @@ def solve_captcha():
     if not session_data:
         return jsonify({'success': False, 'error': 'Invalid session'})
     
-    # Here you would typically use the scraper to submit the CAPTCHA
-    # This is a simplified implementation
     try:
-        # Update your scraper instance to use this CAPTCHA solution
-        scraper = ECourtsScraperEnhanced()
-        success = scraper.submit_captcha_solution(captcha_text)
+        # Answer in the same browser that displayed the CAPTCHA
+        scraper = ECourtsScraperEnhanced.for_captcha_session(
+            get_browser_pool(), session_id, sessions=get_captcha_sessions()
+        )
+        if scraper is None:
+            return jsonify({'success': False, 'error': 'CAPTCHA session expired'})
+        try:
+            success = scraper.submit_captcha_solution(captcha_text)
+        except Exception:
+            scraper.release_driver()
+            raise
+        if success:
+            scraper.release_driver()
+        else:
+            # Pin the browser again so the user can retry in it
+            scraper.pool.pin(scraper.browser, session_id)
+            scraper.browser = None
+            scraper.driver = None
         
         if success:
             session_data['solved'] = True
@@ -0,0 +1,48 @@
+from hierarchy_cache import HierarchyCache, SQLiteBackend
+from hierarchy_index import HierarchyIndex
+from scraper import ECourtsScraper
+
+STATES = [{'name': 'Delhi', 'value': '7'}, {'name': 'Kerala', 'value': '32'}]
+DISTRICTS = [{'name': 'New Delhi', 'value': '1'}, {'name': 'South', 'value': '2'}]
+
+
+class StubScraper(ECourtsScraper):
+    """Serves fixed hierarchy data and counts upstream loads"""
+
+    def __init__(self, cache, renderer=None):
+        super().__init__(cache=cache, renderer=renderer or object())
+        self.loads = 0
+
+    def _fetch_states(self):
+        self.loads += 1
+        return STATES
+
+    def _try_ajax_districts(self, state_value, state_name):
+        self.loads += 1
+        return DISTRICTS
+
+
+def test_resolve_district_after_restart_with_disk_cache(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first = StubScraper(HierarchyCache(backend=SQLiteBackend(path)))
+    assert first.resolve_district('Delhi', 'New Delhi') == ('7', '1')
+
+    # A new process: memory and index are empty, the disk backend is not
+    restarted = StubScraper(HierarchyCache(backend=SQLiteBackend(path)))
+    assert restarted.get_districts('Delhi') == DISTRICTS
+    assert restarted.resolve_district('Delhi', 'New Delhi') == ('7', '1')
+    assert restarted.loads == 0
+
+
+def test_reloading_a_parent_drops_removed_names():
+    index = HierarchyIndex()
+    index.load_districts('7', DISTRICTS)
+    index.load_districts('7', [{'name': 'South Delhi', 'value': '2'}])
+    assert index.district_code('7', 'New Delhi') is None
+    assert index.district_code('7', 'south delhi') == '2'
+    assert index.district_name('7', '1') is None
+
+    index.load_complexes('7', '2', [{'name': 'Saket', 'value': '10'}])
+    index.load_complexes('7', '2', [{'name': 'Saket Courts', 'value': '11'}])
+    assert index.complex_code('7', '2', 'Saket') is None
+    assert index.complex_name('7', '2', '11') == 'Saket Courts'